@@ -0,0 +1,115 @@
+import os
+import copy
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from utils import clean_text, save_to_json, load_from_json, PIPELINE_VERSION
+from document import Document
+
+logger = logging.getLogger(__name__)
+
+# Fields of an analyzed article that only depend on its content and company
+ANALYSIS_FIELDS = ('summary', 'sentiment', 'topics', 'reading_time')
+
+def content_key(content, company_name):
+    """Hash the cleaned article content (text or a Document) together with the company name"""
+    cleaned = content.cleaned if isinstance(content, Document) else clean_text(content)
+    data = f"{PIPELINE_VERSION}\0{company_name}\0{cleaned}"
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+class AnalysisCache:
+    """
+    Memoizes per-article NLP results (summary, sentiment, topics and
+    reading time) keyed on content_key. Entries are JSON files under
+    cache_dir, with a small in-memory layer in front; the least recently
+    used files are evicted once there are more than max_entries. The
+    in-memory layer keeps its own copies, so callers may modify the
+    analyses they get or put.
+    """
+
+    def __init__(self, cache_dir=os.path.join('cache', 'analysis'), max_entries=20000, memory_entries=1000):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.num_entries = None  # Counted lazily on first write
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, content, company_name):
+        """Return the cached analysis for an article, or None"""
+        key = content_key(content, company_name)
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return copy.deepcopy(self.memory[key])
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        result = load_from_json(path)
+        if result is None:
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        self._remember(key, result)
+        return result
+
+    def put(self, content, company_name, article):
+        """Store the analysis fields of an article"""
+        key = content_key(content, company_name)
+        result = {field: article[field] for field in ANALYSIS_FIELDS}
+        self._remember(key, result)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        is_new = not os.path.exists(path)
+        if not save_to_json(result, path):
+            return
+        with self.lock:
+            if self.num_entries is None:
+                self.num_entries = self._count()
+            elif is_new:
+                self.num_entries += 1
+            if self.num_entries > self.max_entries:
+                self._evict()
+
+    def clear(self):
+        """Remove every cached analysis"""
+        with self.lock:
+            self.memory.clear()
+            if os.path.isdir(self.cache_dir):
+                for entry in os.scandir(self.cache_dir):
+                    if entry.name.endswith('.json'):
+                        os.remove(entry.path)
+            self.num_entries = 0
+
+    def _remember(self, key, result):
+        result = copy.deepcopy(result)
+        with self.lock:
+            self.memory[key] = result
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_entries:
+                self.memory.popitem(last=False)
+
+    def _count(self):
+        return sum(1 for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json'))
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is 10% under its cap"""
+        entries = sorted(
+            (entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        excess = len(entries) - int(self.max_entries * 0.9)
+        for entry in entries[:max(0, excess)]:
+            try:
+                os.remove(entry.path)
+            except OSError as e:
+                logger.error(f"Error evicting analysis cache entry {entry.path}: {e}")
+        self.num_entries = len(entries) - max(0, excess)
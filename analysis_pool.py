@@ -0,0 +1,88 @@
+"""
+Process-pool stage for the CPU-bound NLP work (summary, sentiment, topics
+and reading time), so large batches of articles use every core instead
+of being serialized by the GIL.
+
+Each worker loads the NLTK tokenizer, stopwords and sentiment lexicon once
+in its initializer. Tasks carry only (content, company_name) and return the
+small analysis dicts, and are sent in chunks to keep IPC overhead low.
+"""
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Articles sent to a worker per task
+DEFAULT_CHUNKSIZE = 16
+
+# Workers are started by a forkserver (spawn where it is unavailable): the
+# pool is created next to the fetch thread pools, and forking a process
+# that has threads can copy locks held by those threads
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+def _init_worker():
+    """Load the NLP resources once per worker process"""
+    from resources import warm_resources
+    warm_resources()
+
+def analyze_chunk(tasks):
+    """Analyze a list of (content, company_name) pairs in the current process"""
+    from document import Document
+    from api import generate_summary, analyze_sentiment_batch, extract_topics, calculate_reading_time
+
+    docs = [Document(content) for content, _ in tasks]
+    sentiments = analyze_sentiment_batch(docs)
+    return [
+        {
+            'summary': generate_summary(doc, company_name),
+            'sentiment': sentiment,
+            'topics': extract_topics(doc, company_name),
+            'reading_time': calculate_reading_time(doc)
+        }
+        for doc, (_, company_name), sentiment in zip(docs, tasks, sentiments)
+    ]
+
+class AnalysisPool:
+    """
+    A reusable pool of analysis worker processes.
+
+        with AnalysisPool(max_workers=16) as pool:
+            results = pool.analyze([(content, "Tesla"), ...])
+    """
+
+    def __init__(self, max_workers=None, chunksize=DEFAULT_CHUNKSIZE):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = max(1, chunksize)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(START_METHOD),
+            initializer=_init_worker
+        )
+
+    def analyze(self, tasks):
+        """
+        Analyze (content, company_name) pairs and return one dict with
+        summary, sentiment, topics and reading_time per pair, in order
+        """
+        tasks = list(tasks)
+        chunks = [tasks[i:i + self.chunksize] for i in range(0, len(tasks), self.chunksize)]
+        results = []
+        for chunk_results in self.executor.map(analyze_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def analyze_texts(tasks, max_workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Analyze (content, company_name) pairs on a temporary process pool"""
+    with AnalysisPool(max_workers, chunksize) as pool:
+        return pool.analyze(tasks)
@@ -1,28 +1,31 @@
-import requests
-from bs4 import BeautifulSoup
 import re
-from textblob import TextBlob
-import nltk
-from nltk.tokenize import sent_tokenize
-from nltk.corpus import stopwords
-from collections import Counter
-import io
-from gtts import gTTS
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, Future
+import itertools
+import asyncio
+import functools
+import threading
 import random
-import time
 import logging
 from datetime import datetime
+import numpy as np
+from network import http_get, fetch_html
+from http_cache import HttpCache
+from analysis_cache import AnalysisCache
+from dedup import DuplicateIndex, unique_urls, minhash
+from tts import synthesize_speech
+from html_extract import DEFAULT_BACKEND
+from extractors import get_extractor, get_extractors
+import batch_sentiment
+import metrics
+from document import Document, as_document
+from records import ArticleBatch
+from utils import MOCK_ARTICLE_URL_PREFIX
+from resources import get_stop_words, TRANSLATION_RE, COMPANY_RE, translate_word, canonical_company
 
-# Download necessary NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
-
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# NLTK data, the sentiment lexicon and the HTML parsers are loaded on
+# first use; call resources.warm_resources() to load them up front.
+# Logging is configured by the entry points (utils.configure_logging).
 logger = logging.getLogger(__name__)
 
 def clean_text(text):
@@ -51,19 +54,16 @@ def format_date(date_str):
         logger.error(f"Error formatting date {date_str}: {e}")
         return date_str
 
-def fetch_news(company_name, num_articles=10):
-    """Fetch and extract news articles related to the company"""
-    articles = []
+# Default number of worker threads used to download and analyze articles
+DEFAULT_FETCH_WORKERS = 8
+
+def get_news_sources(company_name):
+    """Build the list of search pages and example URLs to crawl for a company"""
     sources = [
-        f"https://www.google.com/search?q={company_name}+news&tbm=nws",
-        f"https://economictimes.indiatimes.com/search?q={company_name}",
-        f"https://www.business-standard.com/search?q={company_name}",
+        extractor.search_url_for(company_name) for extractor in get_extractors()
+        if extractor.search_url
     ]
     
-    headers = {
-        'User -Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     # Add example URLs for testing
     if company_name.lower() == "tesla":
         example_urls = [
@@ -76,182 +76,371 @@ def fetch_news(company_name, num_articles=10):
         ]
         sources.extend(example_urls)
     
-    # Process each source
-    for source in sources:
-        try:
-            time.sleep(1)  # Avoid overwhelming servers
-            response = requests.get(source, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            if "google.com" in source:
-                for item in soup.select('div.SoaBEf'):
-                    link_elem = item.find('a')
-                    if link_elem and link_elem.get('href'):
-                        article_url = link_elem['href']
-                        article_data = extract_article_data(article_url, company_name)
-                        if article_data:
-                            articles.append(article_data)
-                            if len(articles) >= num_articles:
-                                break
-            elif "economictimes" in source:
-                for item in soup.select('div.eachStory'):
-                    link_elem = item.find('a')
-                    if link_elem and link_elem.get('href'):
-                        article_url = "https://economictimes.indiatimes.com" + link_elem['href']
-                        article_data = extract_article_data(article_url, company_name)
-                        if article_data:
-                            articles.append(article_data)
-                            if len(articles) >= num_articles:
-                                break
-            elif "business-standard" in source:
-                for item in soup.select('div.listing-main'):
-                    link_elem = item.find('a')
-                    if link_elem and link_elem.get('href'):
-                        article_url = "https://www.business-standard.com" + link_elem['href']
-                        article_data = extract_article_data(article_url, company_name)
-                        if article_data:
-                            articles.append(article_data)
-                            if len(articles) >= num_articles:
-                                break
-            elif source.startswith("http"):
-                # Direct article URLs
-                article_data = extract_article_data(source, company_name)
-                if article_data:
-                    articles.append(article_data)
-        except Exception as e:
-            logger.error(f"Error processing source {source}: {e}")
-            continue
-        
-        if len(articles) >= num_articles:
-            break
-                
+    return sources
+
+def get_article_links(source):
+    """Return the article URLs listed on a search page (or the URL itself for direct articles)"""
+    try:
+        extractor = get_extractor(source)
+        if not extractor.is_listing(source):
+            # Direct article URLs
+            return [source] if source.startswith("http") else []
+        
+        with metrics.stage('search_fetch'):
+            response = http_get(source)
+            metrics.add_bytes('search_fetch', len(response.content))
+            return extractor.extract_links(response.text, source)
+    except Exception as e:
+        logger.error(f"Error processing source {source}: {e}")
+        return []
+
+def iter_in_order(func, items, limit, max_workers=DEFAULT_FETCH_WORKERS, executor=None):
+    """
+    Run func over items on a thread pool and yield the first `limit` truthy
+    results in input order, each as soon as it (and everything before it)
+    is done. At most max_workers calls are in flight at once; once enough
+    results are yielded, or the generator is closed, queued calls are
+    cancelled. Pass `executor` to share an existing thread pool.
+    """
+    if limit <= 0:
+        return
+    
+    items = iter(items)
+    pending = deque()
+    found = 0
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        for item in itertools.islice(items, max(1, max_workers)):
+            pending.append(executor.submit(func, item))
+        
+        while pending and found < limit:
+            result = pending.popleft().result()
+            if result:
+                found += 1
+                yield result
+            if found < limit:
+                for item in itertools.islice(items, 1):
+                    pending.append(executor.submit(func, item))
+    finally:
+        # Drop queued work and don't wait for calls that are still running
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def collect_in_order(func, items, limit, max_workers=DEFAULT_FETCH_WORKERS):
+    """
+    Run func over items on a thread pool and return the first `limit` truthy
+    results in input order (see iter_in_order)
+    """
+    return list(iter_in_order(func, items, limit, max_workers))
+
+def iter_news(company_name, num_articles=10, max_workers=DEFAULT_FETCH_WORKERS, eager_audio=False, sources=None):
+    """
+    Generator version of fetch_news: yields each analyzed article as soon
+    as it is ready, in the same order fetch_news returns them
+    """
+    sources = sources or get_news_sources(company_name)
+    
+    # Discover article links from every source, keeping source order
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources)))) as executor:
+        source_links = list(executor.map(get_article_links, sources))
+    candidate_urls = unique_urls(url for links in source_links for url in links)
+    
+    # Syndicated copies of an article are skipped and the next candidate is
+    # fetched instead; copies are checked in candidate order, so the
+    # highest-ranked copy is kept whichever download finishes first
+    duplicates = DuplicateIndex()
+    count = 0
+    for article in iter_in_order(
+        lambda item: extract_article_data(item[1], company_name, eager_audio, duplicates, position=item[0]),
+        enumerate(candidate_urls),
+        num_articles,
+        max_workers
+    ):
+        count += 1
+        yield article
+    
+    # Generate mock data if needed
+    while count < num_articles:
+        count += 1
+        yield generate_mock_article(company_name, count)
+
+def fetch_news(company_name, num_articles=10, max_workers=DEFAULT_FETCH_WORKERS, eager_audio=False, stream=False, sources=None):
+    """
+    Fetch and extract news articles related to the company.
+    Search pages are read concurrently, then articles are downloaded and
+    analyzed on max_workers threads (max_workers=1 crawls serially).
+    Per-article audio is generated only when eager_audio is set.
+    With stream=True a generator is returned that yields each article as
+    soon as it has been analyzed. `sources` replaces the default search
+    pages of the registered sites (see extractors.py) with other search
+    pages or article URLs.
+    """
+    articles = iter_news(company_name, num_articles, max_workers, eager_audio, sources)
+    if stream:
+        return articles
+    return list(articles)
+
+async def collect_in_order_async(coro_func, items, limit, max_workers=DEFAULT_FETCH_WORKERS):
+    """
+    Asyncio counterpart of collect_in_order: await coro_func over items with
+    at most max_workers tasks running and return the first `limit` truthy
+    results in input order, cancelling the remaining tasks.
+    """
+    results = []
+    if limit <= 0:
+        return results
+    
+    items = iter(items)
+    pending = deque()
+    try:
+        for item in itertools.islice(items, max(1, max_workers)):
+            pending.append(asyncio.ensure_future(coro_func(item)))
+        
+        while pending and len(results) < limit:
+            result = await pending.popleft()
+            if result:
+                results.append(result)
+            if len(results) < limit:
+                for item in itertools.islice(items, 1):
+                    pending.append(asyncio.ensure_future(coro_func(item)))
+    finally:
+        for task in pending:
+            task.cancel()
+    
+    return results
+
+async def extract_article_data_async(url, company_name, executor=None, eager_audio=False, duplicates=None,
+                                     previous_turn=None, turn=None):
+    """
+    Async version of extract_article_data. The download runs in a worker
+    thread and parsing/analysis run on `executor` (the loop's default
+    thread pool when None), so the event loop is never blocked. With the
+    asyncio.Events previous_turn and turn, the duplicate check waits for
+    previous_turn and sets turn once done, so articles are checked in order.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        html = await asyncio.to_thread(download_article, url)
+        parsed = await loop.run_in_executor(executor, parse_article_html, html, url, company_name)
+        if not parsed:
+            return None
+        if duplicates:
+            signature = minhash(parsed['content'])
+            if previous_turn is not None:
+                await previous_turn.wait()
+            unique = duplicates.check_signature(url, signature)
+            if turn is not None:
+                turn.set()
+            if not unique:
+                return None
+        return await loop.run_in_executor(
+            executor, functools.partial(analyze_article, parsed, company_name, eager_audio=eager_audio)
+        )
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Error extracting data from {url}: {e}")
+        metrics.record_failure('article', type(e).__name__)
+        return None
+    finally:
+        if turn is not None:
+            turn.set()
+
+async def fetch_news_async(company_name, num_articles=10, max_workers=DEFAULT_FETCH_WORKERS, executor=None, eager_audio=False, sources=None):
+    """Async version of fetch_news returning the same list of article dicts"""
+    sources = sources or get_news_sources(company_name)
+    
+    # Discover article links from every source, keeping source order
+    source_links = await asyncio.gather(*[asyncio.to_thread(get_article_links, source) for source in sources])
+    candidate_urls = unique_urls(url for links in source_links for url in links)
+    
+    # Duplicates are checked in candidate order, as in iter_news
+    duplicates = DuplicateIndex()
+    turns = [asyncio.Event() for _ in candidate_urls]
+    articles = await collect_in_order_async(
+        lambda i: extract_article_data_async(
+            candidate_urls[i], company_name, executor, eager_audio, duplicates,
+            turns[i - 1] if i else None, turns[i]
+        ),
+        range(len(candidate_urls)),
+        num_articles,
+        max_workers
+    )
+    
     # Generate mock data if needed
     while len(articles) < num_articles:
         articles.append(generate_mock_article(company_name, len(articles) + 1))
     
     return articles[:num_articles]
 
-def extract_article_data(url, company_name):
-    """Extract data from a news article URL"""
-    try:
-        headers = {
-            'User -Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract title
-        title = soup.find('h1')
-        if title:
-            title = title.get_text().strip()
-        else:
-            title_candidates = [
-                soup.select_one('div.artTitle h1'), 
-                soup.select_one('div.headline'),
-                soup.select_one('.article-title'),
-                soup.select_one('.story-headline')
-            ]
-            for candidate in title_candidates:
-                if candidate:
-                    title = candidate.get_text().strip()
-                    break
-            if not title:
-                title = f"Article about {company_name}"
-        
-        # Extract article content
-        content = ""
-        article_elements = [
-            soup.select('div.artText p'),
-            soup.select('div.story-content p'),
-            soup.select('article p'),
-            soup.select('.article-content p')
-        ]
-        
-        for elements in article_elements:
-            if elements:
-                content = ' '.join([p.get_text().strip() for p in elements])
-                break
-        
-        if not content:
-            paragraphs = soup.find_all('p')
-            content = ' '.join([p.get_text().strip() for p in paragraphs if len(p.get_text().strip()) > 50])
-        
-        if not content:
-            return None
-        
-        # Extract date
-        date = None
-        date_elements = [
-            soup.select_one('meta[property="article:published_time"]'),
-            soup.select_one('meta[name="publish-date"]'),
-            soup.select_one('.date'),
-            soup.select_one('.article-date'),
-            soup.select_one('time')
-        ]
-        
-        for element in date_elements:
-            if element:
-                if element.get('content'):
-                    date = element.get('content')
-                else:
-                    date = element.get_text().strip()
-                break
-        
-        if not date:
-            date = "Recent"
-        else:
-            date = format_date(date)
-        
-        # Extract source
-        source = url.split('//')[1].split('/')[0].replace('www.', '')
-        
+async def analyze_company_async(company_name, num_articles=10, max_workers=DEFAULT_FETCH_WORKERS, executor=None, eager_audio=False, sources=None):
+    """
+    Fetch and analyze news for a company without blocking the event loop.
+    Returns the articles together with the comparative analysis and overall
+    summary that app.py renders.
+    """
+    articles = await fetch_news_async(company_name, num_articles, max_workers, executor, eager_audio, sources)
+    
+    loop = asyncio.get_running_loop()
+    comparative_analysis = await loop.run_in_executor(executor, generate_comparative_analysis, articles)
+    overall_summary = generate_overall_summary(company_name, articles, comparative_analysis)
+    
+    return {
+        'company': company_name,
+        'articles': articles,
+        'comparative_analysis': comparative_analysis,
+        'overall_summary': overall_summary
+    }
+
+# Shared on-disk cache for article pages
+article_cache = HttpCache()
+
+def download_article(url, cache=article_cache):
+    """Download the HTML of an article page, using the HTTP cache when given"""
+    with metrics.stage('article_fetch'):
+        return fetch_html(url, cache)
+
+@metrics.timed('parse')
+def parse_article_html(html, url, company_name=None, backend=DEFAULT_BACKEND):
+    """
+    Extract title, content, date and source from an article page. Without
+    a company_name, 'title' is None when the page has no headline.
+    """
+    extractor = get_extractor(url)
+    title, content, date = extractor.extract_article(html, backend)
+    if title is None and company_name:
+        title = f"Article about {company_name}"
+    
+    if not content:
+        metrics.record_failure('parse', 'no_content')
+        return None
+    
+    if not date:
+        date = "Recent"
+    else:
+        date = extractor.parse_date(date)
+    
+    # Extract source
+    source = url.split('//')[1].split('/')[0].replace('www.', '')
+    
+    return {
+        'title': title,
+        'content': content,
+        'url': url,
+        'date': date,
+        'source': source
+    }
+
+def build_article(parsed, company_name, analysis, audio_summary=None):
+    """Combine a parsed article and its analysis results into an article dict"""
+    title = parsed['title'] if parsed['title'] is not None else f"Article about {company_name}"
+    return {
+        'title': clean_text(title),
+        'summary': analysis['summary'],
+        'content': clean_text(parsed['content'][:2000]),  # Limit content length
+        'url': parsed['url'],
+        'date': parsed['date'],
+        'source': parsed['source'],
+        'sentiment': analysis['sentiment'],
+        'topics': analysis['topics'],
+        'reading_time': analysis['reading_time'],
+        'audio_summary': audio_summary
+    }
+
+# Shared cache of per-article NLP results
+analysis_cache = AnalysisCache()
+
+def analyze_article(parsed, company_name, cache=analysis_cache, eager_audio=False):
+    """
+    Run summary, sentiment, topic and reading-time analysis on a parsed
+    article. Results are memoized on the article content and company, so
+    articles seen before skip the NLP work. Hindi audio of the summary is
+    only generated when eager_audio is set; otherwise use
+    request_article_audio / get_article_audio.
+    """
+    content = parsed['content']
+    
+    # Tokenize once and share the result between all analysis steps
+    doc = Document(content)
+    
+    cached = cache.get(doc, company_name) if cache else None
+    if cache:
+        metrics.record_cache('analysis', bool(cached))
+    if cached:
+        summary = cached['summary']
+        sentiment = cached['sentiment']
+        topics = cached['topics']
+        reading_time = cached['reading_time']
+    else:
         # Generate summary
-        summary = generate_summary(content, company_name)
+        summary = generate_summary(doc, company_name)
         
         # Perform sentiment analysis
-        sentiment = analyze_sentiment(content)
+        sentiment = analyze_sentiment(doc)
         
         # Extract key topics
-        topics = extract_topics(content, company_name)
+        topics = extract_topics(doc, company_name)
         
         # Calculate reading time
-        reading_time = calculate_reading_time(content)
-        
-        # Generate audio summary
-        audio_summary = text_to_speech_hindi(summary)
-        
-        return {
-            'title': clean_text(title),
-            'summary': summary,
-            'content': clean_text(content[:2000]),  # Limit content length
-            'url': url,
-            'date': date,
-            'source': source,
-            'sentiment': sentiment,
-            'topics': topics,
-            'reading_time': reading_time,
-            'audio_summary': audio_summary
-        }
+        reading_time = calculate_reading_time(doc)
+    
+    # Generate audio summary only when asked to
+    audio_summary = text_to_speech_hindi(summary) if eager_audio else None
+    
+    article = build_article(parsed, company_name, {
+        'summary': summary,
+        'sentiment': sentiment,
+        'topics': topics,
+        'reading_time': reading_time
+    }, audio_summary)
+    
+    if cache and not cached:
+        cache.put(doc, company_name, article)
+    
+    return article
+
+def extract_article_data(url, company_name, eager_audio=False, duplicates=None, position=None):
+    """
+    Extract data from a news article URL. With a DuplicateIndex, articles
+    already seen under another URL return None before being analyzed;
+    `position` is the URL's rank in the candidate list (see DuplicateIndex).
+    """
+    try:
+        html = download_article(url)
+        parsed = parse_article_html(html, url, company_name)
+        if not parsed or (duplicates and not duplicates.check(url, parsed['content'], position)):
+            return None
+        return analyze_article(parsed, company_name, eager_audio=eager_audio)
     except Exception as e:
         logger.error(f"Error extracting data from {url}: {e}")
+        metrics.record_failure('article', type(e).__name__)
         return None
+    finally:
+        if duplicates:
+            duplicates.release(position)
 
+@metrics.timed('summarize')
 def generate_summary(text, company_name):
-    """Generate a summary from the article content"""
+    """Generate a summary from the article content (text or a Document)"""
+    doc = as_document(text)
     try:
-        sentences = sent_tokenize(text)
+        sentences = doc.sentences
         
         if len(sentences) <= 3:
-            return text
+            return doc.text
         
         # Score sentences
+        company_lower = company_name.lower()
         sentence_scores = {}
-        for i, sentence in enumerate(sentences):
+        for i, (sentence_lower, words) in enumerate(zip(doc.lower_sentences, doc.sentence_word_counts)):
             score = 0
             
             # Higher score for sentences with company name
-            if company_name.lower() in sentence.lower():
+            if company_lower in sentence_lower:
                 score += 3
             
             # Higher score for sentences at the beginning
@@ -259,7 +448,6 @@ def generate_summary(text, company_name):
                 score += 2
             
             # Higher score for medium-length sentences
-            words = len(sentence.split())
             if 10 <= words <= 25:
                 score += 1
             
@@ -275,16 +463,22 @@ def generate_summary(text, company_name):
         return clean_text(summary)
     except Exception as e:
         logger.error(f"Error generating summary: {e}")
+        metrics.record_failure('summarize', type(e).__name__)
         # Fallback to simple summary
-        sentences = sent_tokenize(text)
+        sentences = doc.sentences
         return ' '.join(sentences[:min(3, len(sentences))])
 
+@metrics.timed('sentiment')
 def analyze_sentiment(text):
-    """Perform sentiment analysis using TextBlob"""
-    analysis = TextBlob(text)
+    """
+    Perform sentiment analysis with TextBlob's lexicon (text or a Document).
+    Scores are identical to TextBlob(text).sentiment.polarity.
+    """
+    doc = as_document(text)
     
     # TextBlob polarity is in range [-1.0, 1.0]
-    polarity = analysis.sentiment.polarity
+    polarity, _ = batch_sentiment.score_texts(None, tokenized=[doc.sentiment_tokens])
+    polarity = float(polarity[0])
     
     # Determine sentiment label
     if polarity > 0.1:
@@ -296,21 +490,33 @@ def analyze_sentiment(text):
     
     return {'label': label, 'score': polarity}
 
+def analyze_sentiment_batch(texts):
+    """
+    Perform sentiment analysis on many texts (or Documents) at once; same
+    results as analyze_sentiment but scored in one vectorized pass. Each
+    text is still tokenized on its own, which dominates the cost, so this
+    is about as fast as calling analyze_sentiment per text.
+    """
+    polarity, _ = batch_sentiment.score_texts(None, tokenized=[as_document(text).sentiment_tokens for text in texts])
+    return [{'label': batch_sentiment.sentiment_label(score), 'score': float(score)} for score in polarity]
+
+@metrics.timed('topics')
 def extract_topics(text, company_name):
-    """Extract key topics from the article"""
+    """Extract key topics from the article (text or a Document)"""
+    doc = as_document(text)
     try:
         # Tokenize text into words
-        words = re.findall(r'\b[A-Za-z][a-z]{2,}\b', text)
+        words = doc.topic_words
         
         # Remove stopwords
-        stop_words = set(stopwords.words('english'))
+        stop_words = get_stop_words()
         filtered_words = [word for word in words if word.lower() not in stop_words]
         
         # Count word frequencies
         word_counts = Counter(filtered_words)
         
         # Extract named entities (simple approach for capitalized words)
-        named_entities = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
+        named_entities = doc.capitalized_spans
         entity_counts = Counter(named_entities)
         
         # Combine frequent words and entities
@@ -332,11 +538,12 @@ def extract_topics(text, company_name):
         return final_topics
     except Exception as e:
         logger.error(f"Error extracting topics: {e}")
+        metrics.record_failure('topics', type(e).__name__)
         return [company_name, "Business", "Market"]
 
 def calculate_reading_time(text):
-    """Calculate estimated reading time in minutes"""
-    words = len(text.split())
+    """Calculate estimated reading time in minutes (text or a Document)"""
+    words = len(as_document(text).words)
     minutes = words / 200
 
     if minutes < 1:
@@ -356,123 +563,135 @@ def truncate_text(text, max_length=100):
 
     return text[:max_length].rsplit(' ', 1)[0] + '...'
 
+# Number of coverage differences reported by the comparative analysis
+MAX_COVERAGE_DIFFERENCES = 5
+
+def iter_coverage_differences(batch):
+    """
+    Yield coverage differences between article pairs (i < j) of an
+    ArticleBatch in pair order. Articles with the same sentiment label and
+    the same topics can never differ, so pairs sharing that signature are
+    skipped without building any strings or sets.
+    """
+    labels = batch.labels()
+    titles = batch.titles
+    signature_ids = batch.signature_ids().tolist()
+    remaining = Counter(signature_ids)
+    num_articles = len(batch)
+    
+    # Topic lists and sets, built only for the articles actually compared
+    topics = {}
+    topic_sets = {}
+    def topic_set(i):
+        if i not in topics:
+            topics[i] = batch.topics(i)
+            topic_sets[i] = set(topics[i])
+        return topic_sets[i]
+    
+    for i in range(num_articles):
+        signature = signature_ids[i]
+        remaining[signature] -= 1
+        # Every later article has the same signature as this one
+        if remaining[signature] == num_articles - i - 1:
+            continue
+        
+        for j in range(i + 1, num_articles):
+            if signature_ids[j] == signature:
+                continue
+            topics1, topics2 = topic_set(i), topic_set(j)
+            
+            # Find differences in sentiment
+            if labels[i] != labels[j]:
+                comparison = f"Article {i+1} ({truncate_text(titles[i], 40)}) is {labels[i].lower()}, while Article {j+1} ({truncate_text(titles[j], 40)}) is {labels[j].lower()}."
+                
+                # Determine impact based on sentiment difference
+                if labels[i] == "Positive" and labels[j] == "Negative":
+                    impact = f"This contrast shows varied market sentiment about {topics[i][0]}."
+                elif labels[i] == "Negative" and labels[j] == "Positive":
+                    impact = f"This highlights both challenges and opportunities for {topics[i][0]}."
+                else:
+                    impact = "These different perspectives provide a more balanced view of the situation."
+                
+                yield {
+                    "Comparison": comparison,
+                    "Impact": impact
+                }
+            
+            # Find differences in topics
+            unique_topics1 = topics1 - topics2
+            unique_topics2 = topics2 - topics1
+            
+            if unique_topics1 and unique_topics2:
+                comparison = f"Article {i+1} focuses on {', '.join(list(unique_topics1)[:2])}, while Article {j+1} covers {', '.join(list(unique_topics2)[:2])}."
+                impact = f"This shows the diverse aspects of {topics[i][0]}'s business being covered in the news."
+                
+                yield {
+                    "Comparison": comparison,
+                    "Impact": impact
+                }
+
+@metrics.timed('comparative_analysis')
+def final_sentiment_analysis(average_sentiment_score, first_topic):
+    """Closing sentence of the comparative analysis"""
+    if average_sentiment_score > 0.2:
+        return f"Overall, the news coverage about {first_topic} is predominantly positive, indicating strong market sentiment."
+    elif average_sentiment_score < -0.2:
+        return f"Overall, the news coverage about {first_topic} is predominantly negative, suggesting potential challenges ahead."
+    else:
+        return f"Overall, the news coverage about {first_topic} is mostly neutral, reflecting a balanced view of the company's current position."
+
 def generate_comparative_analysis(articles):
-    """Generate comparative analysis across all articles"""
-    # Count sentiments
-    sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
-    sentiment_scores = []
-    all_topics = []
-    
-    for article in articles:
-        sentiment_counts[article['sentiment']['label']] += 1
-        sentiment_scores.append(article['sentiment']['score'])
-        all_topics.extend(article['topics'])
-    
-    # Calculate average sentiment score
-    average_sentiment_score = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
+    """
+    Generate comparative analysis across all articles (article dicts,
+    Article records or an ArticleBatch). Counts and frequencies are
+    computed on the batch's columns.
+    """
+    batch = articles if isinstance(articles, ArticleBatch) else ArticleBatch.from_articles(articles)
+    num_articles = len(batch)
+    
+    # Count sentiments and calculate the average sentiment score
+    sentiment_counts = batch.sentiment_counts()
+    average_sentiment_score = batch.average_score()
     
     # Find common topics
-    topic_counts = Counter(all_topics)
-    common_topics = topic_counts.most_common(10)
+    common_topics = batch.most_common_topics(10)
     
     # Group sources
-    sources = Counter([article['source'] for article in articles])
-    
-    # Generate coverage differences
-    coverage_differences = []
-    
-    # Compare each article with every other article
-    for i, article1 in enumerate(articles):
-        for j, article2 in enumerate(articles[i+1:], i+1):
-            if i != j:
-                # Find differences in sentiment
-                if article1['sentiment']['label'] != article2['sentiment']['label']:
-                    comparison = f"Article {i+1} ({truncate_text(article1['title'], 40)}) is {article1['sentiment']['label'].lower()}, while Article {j+1} ({truncate_text(article2['title'], 40)}) is {article2['sentiment']['label'].lower()}."
-                    
-                    # Determine impact based on sentiment difference
-                    if article1['sentiment']['label'] == "Positive" and article2['sentiment']['label'] == "Negative":
-                        impact = f"This contrast shows varied market sentiment about {article1['topics'][0]}."
-                    elif article1['sentiment']['label'] == "Negative" and article2['sentiment']['label'] == "Positive":
-                        impact = f"This highlights both challenges and opportunities for {article1['topics'][0]}."
-                    else:
-                        impact = "These different perspectives provide a more balanced view of the situation."
-                    
-                    coverage_differences.append({
-                        "Comparison": comparison,
-                        "Impact": impact
-                    })
-                
-                # Find differences in topics
-                topics1 = set(article1['topics'])
-                topics2 = set(article2['topics'])
-                
-                unique_topics1 = topics1 - topics2
-                unique_topics2 = topics2 - topics1
-                
-                if unique_topics1 and unique_topics2:
-                    comparison = f"Article {i+1} focuses on {', '.join(list(unique_topics1)[:2])}, while Article {j+1} covers {', '.join(list(unique_topics2)[:2])}."
-                    impact = f"This shows the diverse aspects of {article1['topics'][0]}'s business being covered in the news."
-                    
-                    coverage_differences.append({
-                        "Comparison": comparison,
-                        "Impact": impact
-                    })
-    
-    # Limit to the most significant differences
-    coverage_differences = coverage_differences[:min(5, len(coverage_differences))]
-    
-    # Calculate topic overlap
-    all_article_topics = [set(article['topics']) for article in articles]
-    if all_article_topics:
-        common_topics_set = set.intersection(*all_article_topics)
-    else:
-        common_topics_set = set()
+    sources = batch.source_counts()
+    
+    # Count how many articles mention each topic
+    article_frequency = batch.topic_article_counts()
     
-    # Find unique topics per article
+    # Generate coverage differences, stopping at the most significant ones
+    coverage_differences = list(itertools.islice(
+        iter_coverage_differences(batch),
+        MAX_COVERAGE_DIFFERENCES
+    ))
+    
+    # Calculate topic overlap: topics every article mentions
+    common_topics_set = {batch.topic_names[topic_id] for topic_id in np.flatnonzero(article_frequency == num_articles)}
+    
+    # Find unique topics per article (topics no other article mentions)
     unique_topics_by_article = []
-    for i, article in enumerate(articles):
-        other_topics = []
-        for j, other_article in enumerate(articles):
-            if i != j:
-                other_topics.extend(other_article['topics'])
-        
-        unique = [topic for topic in article['topics'] if topic not in other_topics]
-        if unique:
-            unique_topics_by_article.append({
-                "Article": i+1,
-                "Title": truncate_text(article['title'], 40),
-                "Unique Topics": unique
-            })
-    
-    # Build topic overlap structure
     topic_overlap = {
         "Common Topics": list(common_topics_set),
         "Unique Topics": {}
     }
-    
-    for i, article in enumerate(articles):
-        article_unique_topics = []
-        for topic in article['topics']:
-            exists_elsewhere = False
-            for j, other_article in enumerate(articles):
-                if i != j and topic in other_article['topics']:
-                    exists_elsewhere = True
-                    break
-            
-            if not exists_elsewhere and topic not in topic_overlap["Common Topics"]:
-                article_unique_topics.append(topic)
-        
-        if article_unique_topics:
-            topic_overlap["Unique Topics"][f"Article {i+1}"] = article_unique_topics
+    unique_entries = np.flatnonzero(article_frequency[batch.topic_ids] == 1) if num_articles else []
+    entry_articles = batch.topic_article_index()
+    for i, entries in itertools.groupby(unique_entries, key=lambda entry: entry_articles[entry]):
+        unique = [batch.topic_names[batch.topic_ids[entry]] for entry in entries]
+        unique_topics_by_article.append({
+            "Article": int(i)+1,
+            "Title": truncate_text(batch.titles[i], 40),
+            "Unique Topics": unique
+        })
+        # A single article's topics are all common topics
+        if num_articles > 1:
+            topic_overlap["Unique Topics"][f"Article {i+1}"] = unique
     
     # Generate overall sentiment analysis
-    final_sentiment = ""
-    if average_sentiment_score > 0.2:
-        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is predominantly positive, indicating strong market sentiment."
-    elif average_sentiment_score < -0.2:
-        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is predominantly negative, suggesting potential challenges ahead."
-    else:
-        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is mostly neutral, reflecting a balanced view of the company's current position."
+    final_sentiment = final_sentiment_analysis(average_sentiment_score, batch.topics(0)[0])
     
     return {
         'sentiment_counts': sentiment_counts,
@@ -482,7 +701,7 @@ def generate_comparative_analysis(articles):
         'topic_overlap': topic_overlap,
         'unique_topics_by_article': unique_topics_by_article,
         'sources': sources,
-        'total_articles': len(articles),
+        'total_articles': num_articles,
         'final_sentiment_analysis': final_sentiment
     }
 
@@ -519,63 +738,87 @@ def generate_overall_summary(company_name, articles, comparative_analysis):
     
     return summary
 
+def build_json_report(company_name, articles, comparative_analysis):
+    """Build the JSON report shown in the app's JSON Output tab"""
+    return {
+        "Company": company_name,
+        "Articles": [
+            {
+                "Title": article['title'],
+                "Summary": article['summary'],
+                "Sentiment": article['sentiment']['label'],
+                "Topics": article['topics']
+            } for article in articles
+        ],
+        "Comparative Sentiment Score": {
+            "Sentiment Distribution": comparative_analysis['sentiment_counts'],
+            "Coverage Differences": comparative_analysis['coverage_differences'],
+            "Topic Overlap": {
+                "Common Topics": comparative_analysis['topic_overlap']['Common Topics'],
+                "Most Frequent Topics": comparative_analysis['common_topics']
+            }
+        },
+        "Final Sentiment Analysis": comparative_analysis['final_sentiment_analysis'],
+        "Audio": "[Play Hindi Speech]"
+    }
+
 def text_to_speech_hindi(text):
-    """Convert text to Hindi speech"""
+    """
+    Convert text to Hindi speech. Long text is synthesized in parallel
+    sentence chunks and the audio is cached on disk (see tts.py).
+    """
     try:
-        tts = gTTS(text=text, lang='hi', slow=False)
-        audio_io = io.BytesIO()
-        tts.write_to_fp(audio_io)
-        audio_io.seek(0)
-        return audio_io.read()
+        return synthesize_speech(text, lang='hi') or None
     except Exception as e:
         logger.error(f"Error generating Hindi speech: {e}")
         # Return an empty audio if there's an error
         return None
 
+# Background pool for on-demand per-article audio
+AUDIO_WORKERS = 4
+_audio_executor = None
+_audio_executor_lock = threading.Lock()
+
+def _get_audio_executor():
+    global _audio_executor
+    if _audio_executor is None:
+        with _audio_executor_lock:
+            if _audio_executor is None:
+                _audio_executor = ThreadPoolExecutor(max_workers=AUDIO_WORKERS, thread_name_prefix="article-audio")
+    return _audio_executor
+
+def _synthesize_article_audio(article):
+    audio = text_to_speech_hindi(article['summary'])
+    article['audio_summary'] = audio
+    return audio
+
+def request_article_audio(article):
+    """
+    Start generating Hindi audio for an article's summary in the background.
+    Returns a Future for the MP3 bytes; the article's 'audio_summary' is
+    filled in when it completes.
+    """
+    if article.get('audio_summary'):
+        future = Future()
+        future.set_result(article['audio_summary'])
+        return future
+    return _get_audio_executor().submit(_synthesize_article_audio, article)
+
+def get_article_audio(article, timeout=None):
+    """Return the Hindi audio for an article, generating it if needed"""
+    return request_article_audio(article).result(timeout=timeout)
+
+def request_articles_audio(articles):
+    """Queue audio generation for several articles and return their Futures"""
+    return [request_article_audio(article) for article in articles]
+
 def translate_to_hindi(text):
     """Translate English text to Hindi using a simple rule-based approach"""
-    # Dictionary mapping for simple translations
-    translations = {
-        "positive": "सकारात्मक",
-        "negative": "नकारात्मक",
-        "neutral": "तटस्थ",
-        "articles": "लेख",
-        "summary": "सारांश",
-        "analysis": "विश्लेषण",
-        "news": "समाचार",
-        "sentiment": "भावना",
-        "topics": "विषय",
-        "overall": "समग्र",
-        "company": "कंपनी",
-        "based on": "के आधार पर",
-        "main": "मुख्य",
-        "discussed": "चर्चा की गई",
-        "coverage": "कवरेज",
-        "highlights": "हाइलाइट्स",
-        "concerns about": "के बारे में चिंताएँ",
-        "includes": "शामिल है",
-        "predominantly": "मुख्य रूप से",
-        "mostly": "ज्यादातर",
-        "with": "के साथ",
-        "score": "स्कोर",
-        "and": "और",
-        "are": "हैं",
-        "is": "है",
-        "the": "",
-        "a": "एक",
-        "about": "के बारे में"
-    }
-    
-    # Replace known words with Hindi equivalents
-    for eng, hindi in translations.items():
-        text = re.sub(r'\b' + eng + r'\b', hindi, text, flags=re.IGNORECASE)
+    # Replace known words with Hindi equivalents in a single pass
+    text = TRANSLATION_RE.sub(translate_word, text)
     
     # Keep company names as is
-    common_companies = ["Tesla", "Apple", "Google", "Microsoft", "Amazon", "Samsung", "Tata", "Reliance", "Infosys", "TCS"]
-    for company in common_companies:
-        if company.lower() in text.lower():
-            pattern = re.compile(re.escape(company), re.IGNORECASE)
-            text = pattern.sub(company, text)
+    text = COMPANY_RE.sub(canonical_company, text)
     
     return text
 
@@ -663,10 +906,10 @@ def generate_mock_article(company_name, index):
         'title': title,
         'summary': summary,
         'content': content,
-        'url': f"https://example.com/news/{company_name.lower().replace(' ', '-')}-article-{index}",
+        'url': f"{MOCK_ARTICLE_URL_PREFIX}{company_name.lower().replace(' ', '-')}-article-{index}",
         'date': date,
         'source': random.choice(sources),
         'sentiment': {'label': sentiment_label, 'score': sentiment_score},
         'topics': selected_topics,
         'reading_time': "About 1 minute"
-    }
\ No newline at end of file
+    }
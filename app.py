@@ -1,22 +1,24 @@
 import streamlit as st
 import json
-import os
-from datetime import datetime
 from api import (
     fetch_news,
     analyze_sentiment,
     generate_comparative_analysis,
     text_to_speech_hindi,
     translate_to_hindi,
-    generate_overall_summary
+    generate_overall_summary,
+    build_json_report
 )
 from utils import (
     clean_text,
     truncate_text,
-    save_to_json,
     get_cached_data,
-    create_cache_dir
+    save_cached_data,
+    configure_logging
 )
+from resources import warm_resources
+from store import record_articles
+import metrics
 
 # Page configuration
 st.set_page_config(
@@ -26,6 +28,16 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource(show_spinner="Loading language resources...")
+def load_resources():
+    """Set up logging and load the NLP resources once per server process"""
+    configure_logging()
+    return warm_resources(download=True)
+
+missing_resources = load_resources()
+if missing_resources:
+    st.error(f"Missing NLTK data: {', '.join(missing_resources)}. Install it with `python -m nltk.downloader {' '.join(missing_resources)}`.")
+
 # Add some CSS styling
 st.markdown("""
 <style>
@@ -121,6 +133,12 @@ num_articles = st.number_input("Number of articles to analyze:", min_value=1, ma
 # Cache option
 use_cache = st.checkbox("Use cached data", value=True)
 
+# Performance metrics option
+if st.checkbox("Record performance metrics", value=True):
+    metrics.enable()
+else:
+    metrics.disable()
+
 
 
 # Progress view holder
@@ -133,36 +151,52 @@ def analyze_company_news(company_name, num_articles, use_cache):
     """
     # Check if cached data is available
     if use_cache:
-        cached_data = get_cached_data(company_name)
+        cached_data = get_cached_data(company_name, num_articles)
         if cached_data and len(cached_data.get('articles', [])) >= num_articles:
             st.success(f"Using cached data for {company_name} from {cached_data.get('timestamp', 'recent')}!")
             return cached_data.get('articles', [])[:num_articles]
     
-    # Display progress
+    # Stream articles in as they are analyzed
     progress_bar = progress_placeholder.progress(0)
-    progress_text = progress_placeholder.empty()
+    progress_text = st.empty()
+    running_counts = st.empty()
+    live_articles = st.empty()
     
-    # Fetch news data
     progress_text.text("Fetching news articles...")
-    news_data = fetch_news(company_name, num_articles)
-    progress_bar.progress(50)
-    
-    # Update progress
-    progress_text.text("Analyzing content and generating summaries...")
-    progress_bar.progress(100)
+    news_data = []
+    sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
+    for article in fetch_news(company_name, num_articles, stream=True):
+        news_data.append(article)
+        sentiment_counts[article['sentiment']['label']] += 1
+        
+        # Update progress
+        progress_bar.progress(len(news_data) / num_articles)
+        progress_text.text(f"Analyzed {len(news_data)} of {num_articles} articles...")
+        running_counts.markdown(
+            f"<p><span class='sentiment-positive'>Positive: {sentiment_counts['Positive']}</span> | "
+            f"<span class='sentiment-neutral'>Neutral: {sentiment_counts['Neutral']}</span> | "
+            f"<span class='sentiment-negative'>Negative: {sentiment_counts['Negative']}</span></p>",
+            unsafe_allow_html=True
+        )
+        
+        # Show the articles analyzed so far
+        with live_articles.container():
+            article_tabs = st.tabs([f"Article {i+1}" for i in range(len(news_data))])
+            for tab, item in zip(article_tabs, news_data):
+                with tab:
+                    st.markdown(f"<h3 class='article-title'>{item['title']}</h3>", unsafe_allow_html=True)
+                    st.markdown(f"<p class='article-source'>Source: {item['source']} | Date: {item['date']} | Sentiment: {item['sentiment']['label']} ({item['sentiment']['score']:.2f})</p>", unsafe_allow_html=True)
+                    st.markdown(item['summary'])
     
     # Clear progress indicators
-    progress_bar.empty()
+    progress_placeholder.empty()
     progress_text.empty()
+    running_counts.empty()
+    live_articles.empty()
     
-    # Cache the results
-    cache_dir = create_cache_dir()
-    cache_data = {
-        'company': company_name,
-        'articles': news_data,
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
-    save_to_json(cache_data, os.path.join(cache_dir, f"{company_name.lower().replace(' ', '')}.json"))
+    # Cache the results and add them to the article store
+    save_cached_data(company_name, num_articles, news_data)
+    record_articles(company_name, news_data)
     
     return news_data
 
@@ -179,7 +213,7 @@ if st.button("Analyze Custom Company News"):
         st.error("Please enter a custom company name")
     else:
         # Fetch and analyze news
-        news_data = analyze_company_news(custom_company, 10, use_cache)
+        news_data = analyze_company_news(custom_company, int(num_articles), use_cache)
         
         if news_data:
             # Generate comparative analysis
@@ -345,27 +379,7 @@ if st.button("Analyze Custom Company News"):
                 st.header("JSON Output Format")
                 
                 # Prepare JSON data
-                json_data = {
-                    "Company": custom_company,
-                    "Articles": [
-                        {
-                            "Title": article['title'],
-                            "Summary": article['summary'],
-                            "Sentiment": article['sentiment']['label'],
-                            "Topics": article['topics']
-                        } for article in news_data
-                    ],
-                    "Comparative Sentiment Score": {
-                        "Sentiment Distribution": comparative_analysis['sentiment_counts'],
-                        "Coverage Differences": comparative_analysis['coverage_differences'],
-                        "Topic Overlap": {
-                            "Common Topics": comparative_analysis['topic_overlap']['Common Topics'],
-                            "Most Frequent Topics": comparative_analysis['common_topics']
-                        }
-                    },
-                    "Final Sentiment Analysis": comparative_analysis['final_sentiment_analysis'],
-                    "Audio": "[Play Hindi Speech]"
-                }
+                json_data = build_json_report(custom_company, news_data, comparative_analysis)
                 
                 # Display JSON
                 st.json(json_data)
@@ -382,6 +396,47 @@ if st.button("Analyze Custom Company News"):
         else:
             st.error("Failed to fetch news data. Please try again later or with a different company name.")
 
+# Performance panel
+with st.expander("Performance"):
+    performance = metrics.summary()
+    if not performance['stages']:
+        st.info("No pipeline activity recorded yet." if metrics.is_enabled() else "Performance metrics are disabled.")
+    else:
+        st.subheader("Pipeline Stages")
+        st.table([
+            {
+                "Stage": row['stage'],
+                "Calls": row['calls'],
+                "Total (s)": f"{row['total_seconds']:.2f}",
+                "Mean (ms)": f"{row['mean_ms']:.1f}",
+                "p50 (ms)": f"≤ {row['p50_ms']:g}",
+                "p95 (ms)": f"≤ {row['p95_ms']:g}",
+                "Failures": row['failures'],
+                "Downloaded (KB)": f"{row['bytes'] / 1024:.1f}"
+            } for row in performance['stages']
+        ])
+        
+        if performance['caches']:
+            st.subheader("Caches")
+            st.table([
+                {"Cache": name, "Hits": cache['hits'], "Misses": cache['misses'], "Hit Rate": f"{cache['hit_rate']:.0%}"}
+                for name, cache in performance['caches'].items()
+            ])
+        
+        if performance['failures']:
+            st.subheader("Failures")
+            st.table([
+                {"Stage": stage, "Reason": reason, "Count": count}
+                for (stage, reason), count in sorted(performance['failures'].items())
+            ])
+        
+        if st.checkbox("Show Prometheus metrics"):
+            st.code(metrics.prometheus_text(), language="text")
+        
+        if st.button("Reset metrics"):
+            metrics.reset()
+            st.rerun()
+
 # Instructions at the bottom
 st.markdown("---")
 st.markdown("### How to Use")
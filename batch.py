@@ -0,0 +1,210 @@
+"""
+Headless batch runner: analyze many companies in one sweep and write one
+JSON report per company, in the same schema as the app's JSON Output tab.
+
+    python batch.py companies.txt -n 10 -o reports
+
+The companies file has one company per line; blank lines and lines
+starting with '#' are skipped. All companies share one fetch thread pool,
+the HTTP cache and one analysis process pool, and an article URL listed
+for several companies is downloaded and parsed only once while it is among
+the last MAX_PARSED_ARTICLES parsed.
+"""
+import os
+import re
+import argparse
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+
+import api
+from api import (
+    get_news_sources, get_article_links, iter_in_order, download_article, parse_article_html,
+    build_article, generate_comparative_analysis, build_json_report, generate_mock_article
+)
+from analysis_pool import AnalysisPool
+from http_cache import normalize_url
+from dedup import DuplicateIndex, unique_urls
+from utils import save_to_json, save_cached_data, configure_logging
+from resources import warm_resources
+from store import record_articles
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FETCH_WORKERS = 16
+DEFAULT_COMPANY_WORKERS = 4
+
+# Parsed articles kept for companies that list the same URL
+MAX_PARSED_ARTICLES = 1000
+
+def read_companies(path):
+    """Read company names from a file, one per line, without duplicates"""
+    companies = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            company = line.strip()
+            if not company or company.startswith('#') or company.lower() in seen:
+                continue
+            seen.add(company.lower())
+            companies.append(company)
+    return companies
+
+def report_filename(company_name):
+    """File name of a company's JSON report"""
+    safe_name = re.sub(r'[^\w\-]+', '_', company_name).strip('_') or 'company'
+    return f"{safe_name}_analysis.json"
+
+class BatchRunner:
+    """
+    Shared state of a batch sweep: the fetch thread pool, the analysis
+    process pool and the memo of the last MAX_PARSED_ARTICLES parsed
+    articles by normalized URL.
+    """
+
+    def __init__(self, num_articles=10, fetch_workers=DEFAULT_FETCH_WORKERS, analysis_workers=None):
+        self.num_articles = num_articles
+        self.fetch_workers = fetch_workers
+        self.fetch_executor = ThreadPoolExecutor(max_workers=max(1, fetch_workers))
+        self.analysis_pool = AnalysisPool(max_workers=analysis_workers)
+        self.parsed = OrderedDict()
+        self.parsed_lock = threading.Lock()
+
+    def _download_and_parse(self, url):
+        try:
+            html = download_article(url)
+            return parse_article_html(html, url) if html else None
+        except Exception as e:
+            logger.error(f"Error extracting data from {url}: {e}")
+            return None
+
+    def parse_url(self, url):
+        """Download and parse an article, at most once per normalized URL"""
+        key = normalize_url(url)
+        with self.parsed_lock:
+            future = self.parsed.get(key)
+            owner = future is None
+            if owner:
+                future = self.parsed[key] = Future()
+                # A URL dropped while in flight is at worst parsed again
+                while len(self.parsed) > MAX_PARSED_ARTICLES:
+                    self.parsed.popitem(last=False)
+            else:
+                self.parsed.move_to_end(key)
+        if owner:
+            future.set_result(self._download_and_parse(url))
+        return future.result()
+
+    def fetch_articles(self, company_name):
+        """
+        First num_articles parsed articles for a company, in source order,
+        skipping near-duplicates of articles already taken
+        """
+        # Search pages are fetched on the shared pool as well
+        source_links = list(self.fetch_executor.map(get_article_links, get_news_sources(company_name)))
+        candidate_urls = unique_urls(url for links in source_links for url in links)
+        duplicates = DuplicateIndex()
+
+        # Checked in candidate order, so the same copy of a story is kept on every run
+        def parse_unique(item):
+            position, url = item
+            try:
+                parsed = self.parse_url(url)
+                return parsed if parsed and duplicates.check(url, parsed['content'], position) else None
+            finally:
+                duplicates.release(position)
+
+        return list(iter_in_order(
+            parse_unique, enumerate(candidate_urls), self.num_articles, self.fetch_workers, executor=self.fetch_executor
+        ))
+
+    def analyze_articles(self, company_name, parsed_articles, cache=api.analysis_cache):
+        """Analyze parsed articles, sending only cache misses to the process pool"""
+        analyses = [cache.get(parsed['content'], company_name) for parsed in parsed_articles]
+        misses = [i for i, analysis in enumerate(analyses) if not analysis]
+        if misses:
+            results = self.analysis_pool.analyze(
+                (parsed_articles[i]['content'], company_name) for i in misses
+            )
+            for i, analysis in zip(misses, results):
+                analyses[i] = analysis
+                cache.put(parsed_articles[i]['content'], company_name, analysis)
+        return [build_article(parsed, company_name, analysis) for parsed, analysis in zip(parsed_articles, analyses)]
+
+    def run_company(self, company_name, output_dir):
+        """Fetch, analyze and report one company; returns the report path"""
+        articles = self.analyze_articles(company_name, self.fetch_articles(company_name))
+        while len(articles) < self.num_articles:
+            articles.append(generate_mock_article(company_name, len(articles) + 1))
+
+        comparative_analysis = generate_comparative_analysis(articles)
+        report = build_json_report(company_name, articles, comparative_analysis)
+        path = os.path.join(output_dir, report_filename(company_name))
+        if not save_to_json(report, path):
+            raise IOError(f"Could not write report {path}")
+        save_cached_data(company_name, self.num_articles, articles)
+        record_articles(company_name, articles)
+        return path
+
+    def run(self, companies, output_dir, company_workers=DEFAULT_COMPANY_WORKERS):
+        """Run every company and return {company: report path or None}"""
+        os.makedirs(output_dir, exist_ok=True)
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, company_workers)) as executor:
+            futures = {executor.submit(self.run_company, company, output_dir): company for company in companies}
+            for future in as_completed(futures):
+                company = futures[future]
+                try:
+                    results[company] = future.result()
+                    logger.info(f"Wrote report for {company} to {results[company]}")
+                except Exception as e:
+                    logger.error(f"Error analyzing {company}: {e}")
+                    results[company] = None
+        return results
+
+    def close(self):
+        self.fetch_executor.shutdown(wait=False, cancel_futures=True)
+        self.analysis_pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def run_batch(companies, output_dir='reports', num_articles=10, fetch_workers=DEFAULT_FETCH_WORKERS,
+              analysis_workers=None, company_workers=DEFAULT_COMPANY_WORKERS):
+    """Analyze a list of companies and write one JSON report per company"""
+    with BatchRunner(num_articles, fetch_workers, analysis_workers) as runner:
+        return runner.run(companies, output_dir, company_workers)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze news for a list of companies and write JSON reports")
+    parser.add_argument('companies_file', help="File with one company name per line")
+    parser.add_argument('-n', '--num-articles', type=int, default=10, help="Articles per company (default: 10)")
+    parser.add_argument('-o', '--output', default='reports', help="Directory for the JSON reports (default: reports)")
+    parser.add_argument('--fetch-workers', type=int, default=DEFAULT_FETCH_WORKERS,
+                        help=f"Concurrent downloads shared by all companies (default: {DEFAULT_FETCH_WORKERS})")
+    parser.add_argument('--analysis-workers', type=int, default=None,
+                        help="Analysis worker processes (default: one per CPU)")
+    parser.add_argument('--company-workers', type=int, default=DEFAULT_COMPANY_WORKERS,
+                        help=f"Companies processed at the same time (default: {DEFAULT_COMPANY_WORKERS})")
+    args = parser.parse_args(argv)
+    configure_logging()
+    warm_resources()
+
+    companies = read_companies(args.companies_file)
+    if not companies:
+        parser.error(f"No companies found in {args.companies_file}")
+
+    results = run_batch(
+        companies, args.output, args.num_articles, args.fetch_workers,
+        args.analysis_workers, args.company_workers
+    )
+    failed = [company for company, path in results.items() if path is None]
+    logger.info(f"Analyzed {len(companies) - len(failed)} of {len(companies)} companies")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
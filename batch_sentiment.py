@@ -0,0 +1,203 @@
+"""
+Batch sentiment scoring.
+
+Scores many texts at once with the same lexicon TextBlob uses (pattern's
+en-sentiment.xml). The lexicon is compiled once into NumPy arrays indexed
+by token id, and all tokens of all texts are scored in a single vectorized
+pass, including the modifier ("very good"), negation ("not good") and
+exclamation ("good!") rules of pattern's Sentiment.assessments().
+
+Results match TextBlob's polarity within SENTIMENT_TOLERANCE (floating
+point rounding of the averages); benchmarks/run_benchmarks.py checks this
+on its corpus.
+
+Tokenization is not batched: every text still goes through pattern's
+tokenizer, whose per-token Python loop costs more than the scoring (and
+tokenizing all texts joined in one call is no faster). Scoring a batch is
+therefore only slightly faster than scoring texts one by one.
+"""
+import threading
+import numpy as np
+
+# Maximum absolute difference from TextBlob's polarity
+SENTIMENT_TOLERANCE = 1e-9
+
+# Same thresholds as api.analyze_sentiment
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+class SentimentLexicon:
+    """Compact token -> (polarity, subjectivity, intensity, is_modifier) table"""
+
+    def __init__(self):
+        from textblob.en import sentiment as pattern_sentiment
+        from textblob._text import EMOTICONS, PUNCTUATION
+
+        self.tokenizer = pattern_sentiment.tokenizer
+        len(pattern_sentiment)  # Triggers the lazy XML load
+        words = sorted(dict.keys(pattern_sentiment))
+        self.ids = {word: i for i, word in enumerate(words)}
+        scores = np.array([dict.__getitem__(pattern_sentiment, word)[None] for word in words], dtype=np.float64)
+        self.polarity = scores[:, 0]
+        self.subjectivity = scores[:, 1]
+        self.intensity = scores[:, 2]
+        self.is_modifier = np.array(
+            [any(pos in dict.__getitem__(pattern_sentiment, word) for pos in pattern_sentiment.modifiers) for word in words],
+            dtype=bool
+        )
+        self.is_ly = np.array([word.endswith("ly") for word in words], dtype=bool)
+        self.negations = frozenset(pattern_sentiment.negations)
+
+        # Emoticon polarity, and "(!)" which pattern scores as irony
+        self.emoticons = {"(!)": 0.0}
+        for (_, emoticon_polarity), emoticons in EMOTICONS.items():
+            for emoticon in emoticons:
+                emoticon = emoticon.lower()
+                if not emoticon.isalpha() and len(emoticon) <= 5 and emoticon not in PUNCTUATION:
+                    self.emoticons.setdefault(emoticon, emoticon_polarity)
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+def get_lexicon():
+    """Return the compiled lexicon, building it on first use"""
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = SentimentLexicon()
+    return _lexicon
+
+def tokenize(text):
+    """Lowercased tokens exactly as pattern's sentiment analyzer sees them"""
+    return [word.lower() for word in " ".join(get_lexicon().tokenizer(text)).split()]
+
+def score_texts(texts, tokenized=None):
+    """
+    Return (polarity, subjectivity) arrays for a list of texts. Pass
+    `tokenized` (lists of lowercased tokens) to skip tokenization.
+    """
+    lexicon = get_lexicon()
+    if tokenized is None:
+        tokenized = [tokenize(text) for text in texts]
+    num_docs = len(tokenized)
+    polarity = np.zeros(num_docs)
+    subjectivity = np.zeros(num_docs)
+
+    lengths = np.array([len(tokens) for tokens in tokenized], dtype=np.int64)
+    tokens = [token for doc_tokens in tokenized for token in doc_tokens]
+    n = len(tokens)
+    if n == 0:
+        return polarity, subjectivity
+
+    # Per-token lookups (the only Python-level loop over tokens)
+    ids = np.fromiter((lexicon.ids.get(token, -1) for token in tokens), dtype=np.int64, count=n)
+    token_len = np.fromiter((len(token) for token in tokens), dtype=np.int64, count=n)
+    stripped_len = np.fromiter((len(token.strip("'")) for token in tokens), dtype=np.int64, count=n)
+    is_negation = np.fromiter((token in lexicon.negations for token in tokens), dtype=bool, count=n)
+    is_exclamation = np.fromiter((token == "!" for token in tokens), dtype=bool, count=n)
+    emoticon = np.fromiter((lexicon.emoticons.get(token, np.nan) for token in tokens), dtype=np.float64, count=n)
+
+    positions = np.arange(n)
+    doc = np.repeat(np.arange(num_docs), lengths)
+    doc_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    known = ids >= 0
+    safe_ids = np.where(known, ids, 0)
+    is_emoticon = ~known & ~np.isnan(emoticon)
+
+    # Previous and next known word of every token
+    last_known = np.maximum.accumulate(np.where(known, positions, -1))
+    prev_known = np.concatenate(([-1], last_known[:-1]))
+    has_prev = prev_known >= doc_start
+    prev_ids = safe_ids[np.maximum(prev_known, 0)]
+    prev_safe = np.maximum(prev_known, 0)
+    next_known = np.minimum.accumulate(np.where(known, positions, n)[::-1])[::-1]
+    next_known = np.concatenate((next_known[1:], [n]))
+
+    # A modifier stays active across short words ("really is a good"). After
+    # an "-ly" modifier a negation attaches to the modifier instead
+    # ("really not good") and does not end it.
+    after_ly_modifier = has_prev & lexicon.is_modifier[prev_ids] & lexicon.is_ly[prev_ids]
+    modifier_breaks = np.cumsum(~known & (token_len > 2) & ~(is_negation & after_ly_modifier))
+    modifier_active = has_prev & lexicon.is_modifier[prev_ids] & (modifier_breaks == modifier_breaks[prev_safe])
+    absorbed = known & modifier_active
+    attached_negation = ~known & is_negation & modifier_active & lexicon.is_ly[prev_ids]
+
+    # A negation stays active across single-character tokens ("not a good")
+    free_negation = is_negation & ~attached_negation
+    last_negation = np.maximum.accumulate(np.where(free_negation, positions, -1))
+    last_negation = np.concatenate(([-1], last_negation[:-1]))
+    negation_breaks = np.cumsum(~known & ~is_negation & (stripped_len > 1))
+    negation_safe = np.maximum(last_negation, 0)
+    negated = (
+        known
+        & (last_negation >= doc_start)
+        & (last_negation >= np.where(has_prev, prev_known, doc_start))
+        & (negation_breaks == negation_breaks[negation_safe])
+    )
+
+    # An emoticon between a modifier and its word takes the modifier's place
+    # as the assessment the word is merged into (with intensity 1.0)
+    last_emoticon = np.maximum.accumulate(np.where(is_emoticon, positions, -1))
+    last_emoticon = np.concatenate(([-1], last_emoticon[:-1]))
+    emoticon_between = has_prev & (last_emoticon > prev_known)
+
+    # Token scores, scaled by the intensity of a preceding modifier
+    # (inverted when that modifier was itself negated: "not very good")
+    intensity = lexicon.intensity[prev_ids]
+    intensity = np.where(negated[prev_safe], 1.0 / intensity, intensity)
+    scale = np.where(absorbed & ~emoticon_between, intensity, 1.0)
+    token_polarity = np.clip(lexicon.polarity[safe_ids] * scale, -1.0, 1.0)
+    token_subjectivity = np.clip(lexicon.subjectivity[safe_ids] * scale, -1.0, 1.0)
+
+    # One assessment per emoticon and per chain of modifiers + word,
+    # scored by the chain's last word
+    heads = (known & ~absorbed) | is_emoticon
+    entry_index = np.cumsum(heads) - 1
+    num_entries = int(heads.sum())
+    if num_entries == 0:
+        return polarity, subjectivity
+    merges_next = np.concatenate((absorbed & ~emoticon_between, [False]))[next_known]
+    is_last = known & ~merges_next
+
+    entry_polarity = np.zeros(num_entries)
+    entry_subjectivity = np.zeros(num_entries)
+    entry_doc = doc[heads]
+    entry_polarity[entry_index[is_emoticon]] = emoticon[is_emoticon]
+    entry_subjectivity[entry_index[is_emoticon]] = 1.0
+    entry_polarity[entry_index[is_last]] = token_polarity[is_last]
+    entry_subjectivity[entry_index[is_last]] = token_subjectivity[is_last]
+
+    entry_negated = np.zeros(num_entries, dtype=bool)
+    entry_negated[entry_index[negated | attached_negation]] = True
+
+    # Exclamation marks boost the preceding assessment in the same text,
+    # unless a later word of the same chain overwrites its score
+    exclamation_entry = entry_index[is_exclamation]
+    following = next_known[is_exclamation]
+    overwritten = (
+        np.concatenate((absorbed, [False]))[following]
+        & (np.concatenate((entry_index, [-1]))[following] == exclamation_entry)
+    )
+    valid = (exclamation_entry >= 0) & ~overwritten
+    valid[valid] = entry_doc[exclamation_entry[valid]] == doc[is_exclamation][valid]
+    boosts = np.zeros(num_entries)
+    np.add.at(boosts, exclamation_entry[valid], 1)
+    entry_polarity = np.clip(entry_polarity * 1.25 ** boosts, -1.0, 1.0)
+
+    # "not good" = slightly bad, "not bad" = slightly good
+    entry_polarity = np.where(entry_negated, entry_polarity * -0.5, entry_polarity)
+
+    counts = np.bincount(entry_doc, minlength=num_docs)
+    denominator = np.maximum(counts, 1)
+    polarity = np.bincount(entry_doc, weights=entry_polarity, minlength=num_docs) / denominator
+    subjectivity = np.bincount(entry_doc, weights=entry_subjectivity, minlength=num_docs) / denominator
+    return polarity, subjectivity
+
+def sentiment_label(polarity):
+    """Map a polarity score to Positive / Negative / Neutral"""
+    if polarity > POSITIVE_THRESHOLD:
+        return "Positive"
+    elif polarity < NEGATIVE_THRESHOLD:
+        return "Negative"
+    return "Neutral"
@@ -0,0 +1,86 @@
+"""
+Import-time benchmark.
+
+Measures how long a fresh interpreter takes to import the application
+modules, and which heavy dependencies the import pulls in. NLTK, TextBlob,
+BeautifulSoup and gTTS should only be loaded by warm_resources() or on
+first use, never by the import itself.
+
+Run from the repository root:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --baseline HEAD~1   # compare with another commit
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import subprocess
+import statistics
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ['api', 'analysis_pool', 'batch']
+HEAVY_MODULES = ['nltk', 'textblob', 'bs4', 'soupsieve', 'gtts', 'scipy']
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+WARM_PROBE = """
+import time, json, logging
+logging.disable(logging.CRITICAL)
+start = time.perf_counter()
+from resources import warm_resources
+missing = warm_resources()
+print(json.dumps({'seconds': time.perf_counter() - start, 'missing': missing}))
+"""
+
+def run_probe(code, cwd):
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure(module, cwd, repeat):
+    results = [run_probe(PROBE.format(module=module, heavy=HEAVY_MODULES), cwd) for _ in range(repeat)]
+    return statistics.median(result['seconds'] for result in results), results[-1]['loaded']
+
+def export_tree(ref):
+    """Extract the files of a git commit into a temporary directory"""
+    directory = tempfile.mkdtemp(prefix='bench-import-')
+    archive = os.path.join(directory, 'tree.tar')
+    subprocess.run(['git', 'archive', '-o', archive, ref], cwd=ROOT, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(directory)
+    os.remove(archive)
+    return directory
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters per module (default: 5)")
+    parser.add_argument('--baseline', help="git commit to compare against")
+    args = parser.parse_args()
+
+    baseline_dir = export_tree(args.baseline) if args.baseline else None
+    for module in MODULES:
+        seconds, loaded = measure(module, ROOT, args.repeat)
+        line = f"import {module:<14} {seconds * 1000:8.1f} ms   heavy modules loaded: {', '.join(loaded) or 'none'}"
+        if baseline_dir and os.path.exists(os.path.join(baseline_dir, f"{module}.py")):
+            baseline_seconds, _ = measure(module, baseline_dir, args.repeat)
+            line += f"   (baseline {baseline_seconds * 1000:.1f} ms, {baseline_seconds / seconds:.1f}x)"
+        print(line)
+    if baseline_dir:
+        shutil.rmtree(baseline_dir, ignore_errors=True)
+
+    warm = run_probe(WARM_PROBE, ROOT)
+    print(f"warm_resources()      {warm['seconds'] * 1000:8.1f} ms   missing NLTK data: {', '.join(warm['missing']) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark for the precompiled text resources in resources.py.
+
+Compares the per-call cost of the original implementations (stopword set
+rebuilt from the NLTK corpus and ~40 separate re.sub passes per
+translation) with the precompiled versions now used by api.py, and checks
+that both produce the same output.
+
+Run from the repository root:
+    python benchmarks/bench_text_resources.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nltk.corpus import stopwords
+from resources import get_stop_words, HINDI_TRANSLATIONS, COMMON_COMPANIES
+from api import translate_to_hindi
+
+SAMPLE_SUMMARY = (
+    "Based on the analysis of 10 news articles about Tesla, the overall sentiment is positive "
+    "with 6 positive, 3 neutral, and 1 negative articles. The main topics discussed are Tesla, "
+    "Electric Vehicles, Battery. Positive coverage highlights Tesla Reports Quarterly Results. "
+    "Negative coverage includes concerns about Tesla Faces Regulatory Challenges. Overall, the news "
+    "coverage about Tesla is predominantly positive, indicating strong market sentiment."
+)
+
+def legacy_stop_words():
+    return set(stopwords.words('english'))
+
+def legacy_translate_to_hindi(text):
+    for eng, hindi in HINDI_TRANSLATIONS.items():
+        text = re.sub(r'\b' + eng + r'\b', hindi, text, flags=re.IGNORECASE)
+    for company in COMMON_COMPANIES:
+        if company.lower() in text.lower():
+            pattern = re.compile(re.escape(company), re.IGNORECASE)
+            text = pattern.sub(company, text)
+    return text
+
+def per_call_us(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+def report(name, legacy, current, number):
+    legacy_us = per_call_us(legacy, number)
+    current_us = per_call_us(current, number)
+    print(f"{name:<22} legacy {legacy_us:10.1f} us/call   precompiled {current_us:8.1f} us/call   {legacy_us / current_us:6.1f}x")
+
+def main():
+    assert translate_to_hindi(SAMPLE_SUMMARY) == legacy_translate_to_hindi(SAMPLE_SUMMARY)
+    report("translate_to_hindi", lambda: legacy_translate_to_hindi(SAMPLE_SUMMARY), lambda: translate_to_hindi(SAMPLE_SUMMARY), 2000)
+
+    try:
+        assert get_stop_words() == legacy_stop_words()
+    except LookupError:
+        print("stopwords              skipped: NLTK stopwords corpus is not installed")
+        return
+    report("stopword set", legacy_stop_words, get_stop_words, 200)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Equivalence check for the shared Document tokenization.
+
+generate_summary, analyze_sentiment, extract_topics and
+calculate_reading_time share one document.Document per article, as
+analyze_article calls them. For every text, their results are compared
+with frozen copies of the original functions, which tokenized the raw
+text with NLTK and TextBlob on every call. Summaries, topics, reading
+times and sentiment labels must be identical, sentiment scores within
+batch_sentiment.SENTIMENT_TOLERANCE. Exits with status 1 on any difference.
+
+Run from the repository root (needs the NLTK data, see resources.py):
+    python benchmarks/check_analysis.py
+    python benchmarks/check_analysis.py --texts 2000 --seed 1 --download
+"""
+import os
+import re
+import sys
+import random
+import argparse
+from collections import Counter
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import api
+from document import Document
+from resources import warm_resources
+from batch_sentiment import SENTIMENT_TOLERANCE
+from corpus import COMPANIES, generate_corpus, article_text
+
+# Sentence and word shapes the tokenizers treat specially
+EDGE_SENTENCES = [
+    "Mr. Musk said the U.S. plant would open in Jan. 2025.",
+    "\"We are not worried,\" the CEO told analysts.",
+    "Shares rose 3.5% to $182.40 on Monday!",
+    "Is the deal really good for investors?",
+    "The company's profit was not bad, but margins were very weak.",
+    "TESLA and tesla and Tesla Motors were all mentioned.",
+    "Revenue—driven by strong demand—beat estimates.",
+    "...",
+]
+
+def baseline_generate_summary(text, company_name):
+    from nltk.tokenize import sent_tokenize
+    sentences = sent_tokenize(text)
+
+    if len(sentences) <= 3:
+        return text
+
+    # Score sentences
+    sentence_scores = {}
+    for i, sentence in enumerate(sentences):
+        score = 0
+
+        # Higher score for sentences with company name
+        if company_name.lower() in sentence.lower():
+            score += 3
+
+        # Higher score for sentences at the beginning
+        if i < 3:
+            score += 2
+
+        # Higher score for medium-length sentences
+        words = len(sentence.split())
+        if 10 <= words <= 25:
+            score += 1
+
+        sentence_scores[i] = score
+
+    # Get top 3 sentences
+    top_sentences = sorted(sentence_scores.items(), key=lambda x: x[1], reverse=True)[:3]
+    top_sentences = sorted(top_sentences, key=lambda x: x[0])  # Sort by original position
+
+    # Create summary from top sentences
+    summary = ' '.join([sentences[i] for i, _ in top_sentences])
+
+    return api.clean_text(summary)
+
+def baseline_analyze_sentiment(text):
+    from textblob import TextBlob
+    analysis = TextBlob(text)
+
+    # TextBlob polarity is in range [-1.0, 1.0]
+    polarity = analysis.sentiment.polarity
+
+    # Determine sentiment label
+    if polarity > 0.1:
+        label = "Positive"
+    elif polarity < -0.1:
+        label = "Negative"
+    else:
+        label = "Neutral"
+
+    return {'label': label, 'score': polarity}
+
+def baseline_extract_topics(text, company_name):
+    from nltk.corpus import stopwords
+    # Tokenize text into words
+    words = re.findall(r'\b[A-Za-z][a-z]{2,}\b', text)
+
+    # Remove stopwords
+    stop_words = set(stopwords.words('english'))
+    filtered_words = [word for word in words if word.lower() not in stop_words]
+
+    # Count word frequencies
+    word_counts = Counter(filtered_words)
+
+    # Extract named entities (simple approach for capitalized words)
+    named_entities = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
+    entity_counts = Counter(named_entities)
+
+    # Combine frequent words and entities
+    topics = [word for word, count in word_counts.most_common(10) if count > 1]
+    topics.extend([entity for entity, count in entity_counts.most_common(5) if count > 1])
+
+    # Add company name as a topic
+    if company_name not in topics:
+        topics.insert(0, company_name)
+
+    # Remove duplicates and limit to 5 topics
+    unique_topics = []
+    for topic in topics:
+        if topic not in unique_topics and topic.lower() != company_name.lower():
+            unique_topics.append(topic)
+
+    return [company_name] + unique_topics[:4]
+
+def baseline_calculate_reading_time(text):
+    words = len(text.split())
+    minutes = words / 200
+
+    if minutes < 1:
+        return "Less than a minute"
+    elif minutes < 2:
+        return "About 1 minute"
+    else:
+        return f"About {int(minutes)} minutes"
+
+def sample_texts(num_texts, seed):
+    """(text, company) pairs: corpus articles, some with edge-case sentences mixed in, and short texts"""
+    rng = random.Random(seed)
+    samples = []
+    for article in generate_corpus(num_texts, seed=seed, duplicate_rate=0):
+        sentences = re.split(r'(?<=\.) ', article_text(article))
+        if rng.random() < 0.5:
+            for _ in range(rng.randint(1, 4)):
+                sentences.insert(rng.randint(0, len(sentences)), rng.choice(EDGE_SENTENCES))
+        if rng.random() < 0.2:
+            sentences = sentences[:rng.randint(1, 3)]
+        samples.append((" ".join(sentences), article['company']))
+    samples += [("", rng.choice(COMPANIES)), (" ".join(EDGE_SENTENCES), "Tesla")]
+    return samples
+
+def compare(text, company_name):
+    """Names of the results that differ between the shared Document and the original functions"""
+    doc = Document(text)
+    actual = {
+        'summary': api.generate_summary(doc, company_name),
+        'sentiment': api.analyze_sentiment(doc),
+        'topics': api.extract_topics(doc, company_name),
+        'reading_time': api.calculate_reading_time(doc)
+    }
+    expected = {
+        'summary': baseline_generate_summary(text, company_name),
+        'sentiment': baseline_analyze_sentiment(text),
+        'topics': baseline_extract_topics(text, company_name),
+        'reading_time': baseline_calculate_reading_time(text)
+    }
+    differences = [name for name in ('summary', 'topics', 'reading_time') if actual[name] != expected[name]]
+    if (actual['sentiment']['label'] != expected['sentiment']['label']
+            or abs(actual['sentiment']['score'] - expected['sentiment']['score']) > SENTIMENT_TOLERANCE):
+        differences.append('sentiment')
+    return differences, actual, expected
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the shared Document tokenization against the original functions")
+    parser.add_argument('--texts', type=int, default=500, help="number of corpus texts to check")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the texts")
+    parser.add_argument('--download', action='store_true', help="download missing NLTK data")
+    args = parser.parse_args(argv)
+
+    missing = warm_resources(download=args.download)
+    if missing:
+        print(f"Missing NLTK data: {', '.join(missing)} (install it or pass --download)")
+        return 1
+
+    samples = sample_texts(args.texts, args.seed)
+    failed = 0
+    for i, (text, company_name) in enumerate(samples):
+        differences, actual, expected = compare(text, company_name)
+        if differences:
+            failed += 1
+            if failed <= 5:
+                print(f"MISMATCH text {i} ({company_name})")
+                for name in differences:
+                    print(f"  {name}: expected {expected[name]!r:.200}\n  {name}: got      {actual[name]!r:.200}")
+
+    if failed:
+        print(f"{failed} of {len(samples)} texts differ")
+        return 1
+    print(f"All {len(samples)} texts match the original functions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
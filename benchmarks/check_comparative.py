@@ -0,0 +1,274 @@
+"""
+Equivalence check for generate_comparative_analysis.
+
+Seeded random article sets are analyzed by api.generate_comparative_analysis,
+given as article dicts, as records.Article records and as a
+records.ArticleBatch. Each result is compared with a frozen copy of the
+original dict-based implementation, which compared every pair of articles.
+Every field must be identical, except that "Common Topics" is compared as a
+set, because the original built it from a set. Sliding windows over
+longer article lists, as polled by refresh.py, are also analyzed by
+refresh.update_comparative_analysis, which updates running tallies, and
+compared with generate_comparative_analysis. Exits with status 1 on any
+difference.
+
+Run from the repository root:
+    python benchmarks/check_comparative.py
+    python benchmarks/check_comparative.py --sets 2000 --seed 1
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import generate_comparative_analysis, truncate_text
+from records import Article, ArticleBatch
+from refresh import update_comparative_analysis
+
+TOPICS = ["Tesla", "Electric Vehicles", "Battery", "Market", "Shares", "Revenue", "China", "Musk",
+          "Production", "Profit", "Supply Chain", "Regulators", "Autopilot", "Energy", "Investors"]
+SOURCES = ["economictimes.indiatimes.com", "business-standard.com", "livemint.com", "reuters.com"]
+LABELS = ["Positive", "Neutral", "Negative"]
+
+def baseline_comparative_analysis(articles):
+    """generate_comparative_analysis before the ArticleBatch rewrite"""
+    # Count sentiments
+    sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
+    sentiment_scores = []
+    all_topics = []
+
+    for article in articles:
+        sentiment_counts[article['sentiment']['label']] += 1
+        sentiment_scores.append(article['sentiment']['score'])
+        all_topics.extend(article['topics'])
+
+    # Calculate average sentiment score
+    average_sentiment_score = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
+
+    # Find common topics
+    topic_counts = Counter(all_topics)
+    common_topics = topic_counts.most_common(10)
+
+    # Group sources
+    sources = Counter([article['source'] for article in articles])
+
+    # Generate coverage differences
+    coverage_differences = []
+
+    # Compare each article with every other article
+    for i, article1 in enumerate(articles):
+        for j, article2 in enumerate(articles[i+1:], i+1):
+            if i != j:
+                # Find differences in sentiment
+                if article1['sentiment']['label'] != article2['sentiment']['label']:
+                    comparison = f"Article {i+1} ({truncate_text(article1['title'], 40)}) is {article1['sentiment']['label'].lower()}, while Article {j+1} ({truncate_text(article2['title'], 40)}) is {article2['sentiment']['label'].lower()}."
+
+                    # Determine impact based on sentiment difference
+                    if article1['sentiment']['label'] == "Positive" and article2['sentiment']['label'] == "Negative":
+                        impact = f"This contrast shows varied market sentiment about {article1['topics'][0]}."
+                    elif article1['sentiment']['label'] == "Negative" and article2['sentiment']['label'] == "Positive":
+                        impact = f"This highlights both challenges and opportunities for {article1['topics'][0]}."
+                    else:
+                        impact = "These different perspectives provide a more balanced view of the situation."
+
+                    coverage_differences.append({
+                        "Comparison": comparison,
+                        "Impact": impact
+                    })
+
+                # Find differences in topics
+                topics1 = set(article1['topics'])
+                topics2 = set(article2['topics'])
+
+                unique_topics1 = topics1 - topics2
+                unique_topics2 = topics2 - topics1
+
+                if unique_topics1 and unique_topics2:
+                    comparison = f"Article {i+1} focuses on {', '.join(list(unique_topics1)[:2])}, while Article {j+1} covers {', '.join(list(unique_topics2)[:2])}."
+                    impact = f"This shows the diverse aspects of {article1['topics'][0]}'s business being covered in the news."
+
+                    coverage_differences.append({
+                        "Comparison": comparison,
+                        "Impact": impact
+                    })
+
+    # Limit to the most significant differences
+    coverage_differences = coverage_differences[:min(5, len(coverage_differences))]
+
+    # Calculate topic overlap
+    all_article_topics = [set(article['topics']) for article in articles]
+    if all_article_topics:
+        common_topics_set = set.intersection(*all_article_topics)
+    else:
+        common_topics_set = set()
+
+    # Find unique topics per article
+    unique_topics_by_article = []
+    for i, article in enumerate(articles):
+        other_topics = []
+        for j, other_article in enumerate(articles):
+            if i != j:
+                other_topics.extend(other_article['topics'])
+
+        unique = [topic for topic in article['topics'] if topic not in other_topics]
+        if unique:
+            unique_topics_by_article.append({
+                "Article": i+1,
+                "Title": truncate_text(article['title'], 40),
+                "Unique Topics": unique
+            })
+
+    # Build topic overlap structure
+    topic_overlap = {
+        "Common Topics": list(common_topics_set),
+        "Unique Topics": {}
+    }
+
+    for i, article in enumerate(articles):
+        article_unique_topics = []
+        for topic in article['topics']:
+            exists_elsewhere = False
+            for j, other_article in enumerate(articles):
+                if i != j and topic in other_article['topics']:
+                    exists_elsewhere = True
+                    break
+
+            if not exists_elsewhere and topic not in topic_overlap["Common Topics"]:
+                article_unique_topics.append(topic)
+
+        if article_unique_topics:
+            topic_overlap["Unique Topics"][f"Article {i+1}"] = article_unique_topics
+
+    # Generate overall sentiment analysis
+    final_sentiment = ""
+    if average_sentiment_score > 0.2:
+        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is predominantly positive, indicating strong market sentiment."
+    elif average_sentiment_score < -0.2:
+        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is predominantly negative, suggesting potential challenges ahead."
+    else:
+        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is mostly neutral, reflecting a balanced view of the company's current position."
+
+    return {
+        'sentiment_counts': sentiment_counts,
+        'average_sentiment_score': average_sentiment_score,
+        'common_topics': common_topics,
+        'coverage_differences': coverage_differences,
+        'topic_overlap': topic_overlap,
+        'unique_topics_by_article': unique_topics_by_article,
+        'sources': sources,
+        'total_articles': len(articles),
+        'final_sentiment_analysis': final_sentiment
+    }
+
+def random_articles(rng, num_articles):
+    """Article dicts with repeated topics, tied topic counts and shared (label, topics) signatures"""
+    vocabulary = rng.sample(TOPICS, rng.randint(2, len(TOPICS)))
+    templates = []
+    articles = []
+    for i in range(num_articles):
+        if templates and rng.random() < 0.3:
+            label, topics = rng.choice(templates)
+        else:
+            label = rng.choice(LABELS)
+            topics = [rng.choice(vocabulary) for _ in range(rng.randint(1, 6))]
+            templates.append((label, topics))
+        score = {"Positive": rng.uniform(0.1, 1), "Neutral": rng.uniform(-0.1, 0.1), "Negative": rng.uniform(-1, -0.1)}[label]
+        title = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 12)))
+        articles.append({
+            'title': title,
+            'summary': title,
+            'content': title,
+            'url': f"https://example.com/{i}",
+            'date': "2024-01-01",
+            'source': rng.choice(SOURCES),
+            'sentiment': {'label': label, 'score': score},
+            'topics': list(topics),
+            'reading_time': "Less than a minute",
+            'audio_summary': None
+        })
+    return articles
+
+def normalized(analysis):
+    """The analysis with 'Common Topics' as a sorted list and Counters as item lists"""
+    analysis = dict(analysis)
+    analysis['topic_overlap'] = dict(analysis['topic_overlap'], **{
+        'Common Topics': sorted(analysis['topic_overlap']['Common Topics'])
+    })
+    analysis['sources'] = list(analysis['sources'].items())
+    analysis['sentiment_counts'] = list(analysis['sentiment_counts'].items())
+    return analysis
+
+def check_refresh(rng, num_polls, max_articles):
+    """Number of polls where update_comparative_analysis differs from generate_comparative_analysis"""
+    pool = random_articles(rng, 4 * max_articles)
+    start = 3 * max_articles
+    size = rng.randint(1, max_articles)
+    failed = 0
+    for poll in range(num_polls):
+        # New articles enter at the front, old ones leave at the back, and some analyses change
+        start = max(0, start - rng.randint(0, 3))
+        size = max(1, min(max_articles, size + rng.randint(-3, 3)))
+        articles = pool[start:start + size]
+        if rng.random() < 0.2:
+            i = rng.randrange(len(articles))
+            articles[i] = dict(articles[i], topics=articles[i]['topics'][::-1] + [rng.choice(TOPICS)])
+        expected = normalized(generate_comparative_analysis(articles))
+        actual = normalized(update_comparative_analysis("check_comparative", articles))
+        differences = [field for field in expected if actual.get(field) != expected[field]]
+        if differences:
+            failed += 1
+            if failed <= 5:
+                print(f"MISMATCH poll {poll} ({len(articles)} articles, refresh)")
+                for field in differences:
+                    print(f"  {field}: expected {expected[field]!r:.300}\n  {field}: got      {actual.get(field)!r:.300}")
+    return failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check generate_comparative_analysis against the original implementation")
+    parser.add_argument('--sets', type=int, default=1000, help="number of random article sets")
+    parser.add_argument('--max-articles', type=int, default=60, help="largest article set")
+    parser.add_argument('--polls', type=int, default=500, help="number of refresh polls")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the article sets")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    failed = 0
+    baseline_seconds = batch_seconds = 0.0
+    for i in range(args.sets):
+        articles = random_articles(rng, rng.randint(1, args.max_articles))
+        start = time.perf_counter()
+        expected = normalized(baseline_comparative_analysis(articles))
+        baseline_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        actual = normalized(generate_comparative_analysis(articles))
+        batch_seconds += time.perf_counter() - start
+
+        inputs = [
+            ('dicts', actual),
+            ('records', normalized(generate_comparative_analysis([Article.from_dict(article) for article in articles]))),
+            ('batch', normalized(generate_comparative_analysis(ArticleBatch.from_articles(articles))))
+        ]
+        for input_name, result in inputs:
+            differences = [field for field in expected if result.get(field) != expected[field]]
+            if differences:
+                failed += 1
+                if failed <= 5:
+                    print(f"MISMATCH set {i} ({len(articles)} articles, {input_name})")
+                    for field in differences:
+                        print(f"  {field}: expected {expected[field]!r:.300}\n  {field}: got      {result.get(field)!r:.300}")
+
+    failed += check_refresh(rng, args.polls, args.max_articles)
+
+    print(f"{args.sets} sets, {args.polls} refresh polls: original {baseline_seconds:.2f} s, current {batch_seconds:.2f} s")
+    if failed:
+        print(f"{failed} result(s) differ from the original implementation")
+        return 1
+    print("Every result matches the original implementation")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
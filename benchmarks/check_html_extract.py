@@ -0,0 +1,212 @@
+"""
+Equivalence check and benchmark for the article extraction backends.
+
+The reference is baseline_extract, a frozen copy of the parsing done by
+extract_article_data before extraction moved to html_extract.py. Every
+page in benchmarks/fixtures, and --fuzz randomly generated malformed
+pages, are extracted with it and with each backend using the generic
+rules; pages are also extracted with the rules of every registered site,
+where the bs4 backend is the reference. The script exits with status 1 if
+the default backend or bs4 gives a different (title, content, date);
+differences of the lxml backend, which repairs malformed markup its own
+way, are only counted.
+
+Run from the repository root:
+    python benchmarks/check_html_extract.py
+    python benchmarks/check_html_extract.py --fuzz 4000 --seed 1
+"""
+import os
+import sys
+import glob
+import random
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from html_extract import extract_article_fields, GENERIC_RULES, DEFAULT_BACKEND, etree
+from extractors import get_extractors
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+COMPANY = "Tesla"
+
+BACKENDS = ['htmlparser', 'bs4'] + (['lxml'] if etree is not None else [])
+
+# Backends that must match the reference
+EXACT_BACKENDS = {DEFAULT_BACKEND, 'bs4'}
+
+def baseline_extract(html, company_name=COMPANY):
+    """(title, content, raw date) as extract_article_data parsed them before the series, or None"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Extract title
+    title = soup.find('h1')
+    if title:
+        title = title.get_text().strip()
+    else:
+        title_candidates = [
+            soup.select_one('div.artTitle h1'),
+            soup.select_one('div.headline'),
+            soup.select_one('.article-title'),
+            soup.select_one('.story-headline')
+        ]
+        for candidate in title_candidates:
+            if candidate:
+                title = candidate.get_text().strip()
+                break
+        if not title:
+            title = f"Article about {company_name}"
+
+    # Extract article content
+    content = ""
+    article_elements = [
+        soup.select('div.artText p'),
+        soup.select('div.story-content p'),
+        soup.select('article p'),
+        soup.select('.article-content p')
+    ]
+
+    for elements in article_elements:
+        if elements:
+            content = ' '.join([p.get_text().strip() for p in elements])
+            break
+
+    if not content:
+        paragraphs = soup.find_all('p')
+        content = ' '.join([p.get_text().strip() for p in paragraphs if len(p.get_text().strip()) > 50])
+
+    if not content:
+        return None
+
+    # Extract date
+    date = None
+    date_elements = [
+        soup.select_one('meta[property="article:published_time"]'),
+        soup.select_one('meta[name="publish-date"]'),
+        soup.select_one('.date'),
+        soup.select_one('.article-date'),
+        soup.select_one('time')
+    ]
+
+    for element in date_elements:
+        if element:
+            if element.get('content'):
+                date = element.get('content')
+            else:
+                date = element.get_text().strip()
+            break
+
+    return title, content, date
+
+def backend_extract(html, backend, company_name=COMPANY):
+    """The same fields through html_extract, with parse_article_html's title fallback"""
+    title, content, date = extract_article_fields(html, backend, GENERIC_RULES)
+    if title is None:
+        title = f"Article about {company_name}"
+    if not content:
+        return None
+    return title, content, date
+
+# Pieces of the random pages: the tags, classes and attributes the rules
+# look at, tags html.parser treats specially, and text with entities
+FUZZ_TAGS = ['p', 'p', 'p', 'div', 'div', 'h1', 'article', 'span', 'b', 'time', 'table', 'td', 'li', 'pre',
+             'script', 'style', 'template', 'rt', 'textarea', 'br', 'img', 'hr', 'meta', 'a']
+FUZZ_CLASSES = ['artText', 'story-content', 'article-content', 'headline', 'article-title', 'story-headline',
+                'date', 'article-date', 'artTitle', 'other']
+FUZZ_WORDS = ['Tesla', 'shares', 'rose', 'after', 'strong', 'quarterly', 'deliveries', 'and', 'the', 'market',
+              '&amp;', '&nbsp;', '&#150;', '&#x41;', '&#X4a', '&#128;', '&#99999999;', '&bogus', '&#0;', '&copy', '&#', '</']
+FUZZ_SPACES = [' ', '  ', '\n', '\n  ', '\t']
+
+def _fuzz_attributes(rng, tag):
+    attributes = []
+    if rng.random() < 0.5:
+        attributes.append(f'class="{" ".join(rng.sample(FUZZ_CLASSES, rng.randint(1, 2)))}"')
+    if tag == 'meta' or rng.random() < 0.05:
+        attributes.append(rng.choice(['property="article:published_time"', 'name="publish-date"', 'name="author"']))
+    if rng.random() < 0.2:
+        attributes.append(f'content="{rng.choice(["", "2024-01-02", "2024-03-04T05:06:07"])}"')
+    return ''.join(' ' + attribute for attribute in attributes)
+
+def fuzz_page(rng, size=60):
+    """A random page of unbalanced tags, stray end tags, text, comments and CDATA"""
+    parts = []
+    for _ in range(size):
+        roll = rng.random()
+        tag = rng.choice(FUZZ_TAGS)
+        if roll < 0.35:
+            parts.append(f"<{tag}{_fuzz_attributes(rng, tag)}{'/' if rng.random() < 0.05 else ''}>")
+        elif roll < 0.55:
+            parts.append(f"</{tag}>")
+        elif roll < 0.93:
+            parts.append(' '.join(rng.choice(FUZZ_WORDS) for _ in range(rng.randint(1, 15))))
+        elif roll < 0.97:
+            parts.append(rng.choice(FUZZ_SPACES))
+        else:
+            parts.append(rng.choice(['<!-- comment -->', '<![CDATA[cdata text]]>', '<?pi?>', '<!DOCTYPE html>']))
+    return ''.join(parts)
+
+def compare(name, html, mismatches, show=True):
+    """Compare every backend with the reference on one page; returns whether all exact backends match"""
+    ok = True
+    checks = [('generic', baseline_extract(html), lambda backend: backend_extract(html, backend))]
+    for extractor in get_extractors():
+        rules = extractor.article_rules
+        checks.append((extractor.name, extract_article_fields(html, 'bs4', rules),
+                       lambda backend, rules=rules: extract_article_fields(html, backend, rules)))
+    for rules_name, expected, extract in checks:
+        for backend in BACKENDS:
+            actual = extract(backend)
+            if actual == expected:
+                continue
+            mismatches[backend] = mismatches.get(backend, 0) + 1
+            if backend not in EXACT_BACKENDS:
+                continue
+            ok = False
+            if show:
+                print(f"MISMATCH {name} ({rules_name} rules, {backend})")
+                for field, want, got in zip(('title', 'content', 'date'), expected or (None,) * 3, actual or (None,) * 3):
+                    if want != got:
+                        print(f"  {field}: expected {want!r:.200}\n  {field}: got      {got!r:.200}")
+    return ok
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the extraction backends against the original extractor")
+    parser.add_argument('--fuzz', type=int, default=0, help="number of random malformed pages to check")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the random pages")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    fixture_mismatches = {}
+    print(f"{'fixture':32}" + ''.join(f" {backend + ' ms':>14}" for backend in BACKENDS))
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        name = os.path.basename(path)
+        if not compare(name, html, fixture_mismatches):
+            failed += 1
+            continue
+
+        number = 20 if len(html) < 100000 else 3
+        times = [timeit.timeit(lambda: extract_article_fields(html, backend), number=number) / number
+                 for backend in BACKENDS]
+        print(f"{name:32}" + ''.join(f" {seconds * 1000:14.2f}" for seconds in times))
+
+    fuzz_mismatches = {}
+    rng = random.Random(args.seed)
+    for i in range(args.fuzz):
+        if not compare(f"fuzz page {i}", fuzz_page(rng), fuzz_mismatches, show=failed < 5):
+            failed += 1
+
+    for label, mismatches in [('fixture', fixture_mismatches), ('fuzz', fuzz_mismatches)]:
+        for backend, count in sorted(mismatches.items()):
+            print(f"{backend}: {count} {label} extraction(s) differ from the reference")
+    if failed:
+        print(f"{failed} page(s) differ on the {DEFAULT_BACKEND} or bs4 backend")
+        return 1
+    print(f"The {DEFAULT_BACKEND} and bs4 backends match the original extractor on every page")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
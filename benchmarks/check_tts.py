@@ -0,0 +1,167 @@
+"""
+Offline check of the TTS subsystem (tts.py) with tts.OfflineBackend.
+
+- split_text: every chunk fits in MAX_CHUNK_CHARS and the chunks
+  reassemble to the input text
+- synthesize_speech / stream_speech: one backend call per chunk not
+  cached yet (chunks repeat across texts), the streamed pieces add up to the complete audio and the audio is a valid
+  sequence of MPEG audio frames
+- TTSCache: a second call for the same text makes no backend calls
+
+The caches are written to a temporary directory. Exits with status 1 on
+the first failed check.
+
+Run from the repository root:
+    python benchmarks/check_tts.py
+    python benchmarks/check_tts.py --texts 500 --delay 0.05
+"""
+import os
+import re
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import api
+import tts
+from tts import OfflineBackend, TTSCache, set_tts_backend, get_tts_backend, split_text, stream_speech, synthesize_speech
+from corpus import generate_corpus, article_text
+
+# Bitrates (kbit/s) and sample rates (Hz) of MPEG-1 Layer III frame headers
+MP3_BITRATES = [None, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, None]
+MP3_SAMPLE_RATES = [44100, 48000, 32000, None]
+
+HINDI_SENTENCES = [
+    "टेस्ला ने इस तिमाही में रिकॉर्ड डिलीवरी की सूचना दी।",
+    "विश्लेषकों का कहना है कि मांग मजबूत बनी हुई है।",
+    "कंपनी के शेयर आज बाजार में तेजी से बढ़े!",
+    "क्या नई फैक्ट्री समय पर शुरू होगी?"
+]
+
+def mp3_frames(audio):
+    """Number of MPEG-1 Layer III frames in audio; raises ValueError if it is not a sequence of whole frames"""
+    offset = frames = 0
+    while offset < len(audio):
+        header = audio[offset:offset + 4]
+        if len(header) < 4 or header[0] != 0xff or header[1] & 0xfe != 0xfa:
+            raise ValueError(f"no MPEG-1 Layer III frame header at byte {offset}")
+        bitrate = MP3_BITRATES[header[2] >> 4]
+        sample_rate = MP3_SAMPLE_RATES[(header[2] >> 2) & 0x3]
+        if bitrate is None or sample_rate is None:
+            raise ValueError(f"invalid frame header at byte {offset}")
+        length = 144 * bitrate * 1000 // sample_rate + ((header[2] >> 1) & 0x1)
+        if offset + length > len(audio):
+            raise ValueError(f"truncated frame at byte {offset}")
+        offset += length
+        frames += 1
+    return frames
+
+def sample_texts(num_texts, seed):
+    """Article texts, Hindi sentences with the danda and words longer than a chunk"""
+    rng = random.Random(seed)
+    texts = [article_text(article) for article in generate_corpus(num_texts, seed=seed, duplicate_rate=0)]
+    for i in range(0, len(texts), 3):
+        texts[i] = " ".join(rng.choice(HINDI_SENTENCES) for _ in range(rng.randint(1, 30)))
+    for i in range(1, len(texts), 7):
+        texts[i] += " " + "x" * rng.randint(1, 3 * tts.MAX_CHUNK_CHARS) + "  trailing  words. "
+    return texts
+
+def check_split(text):
+    chunks = split_text(text)
+    if any(not chunk or len(chunk) > tts.MAX_CHUNK_CHARS for chunk in chunks):
+        return "a chunk is empty or longer than MAX_CHUNK_CHARS"
+    # Chunks break at whitespace, or inside words longer than a chunk
+    if re.sub(r'\s+', '', ''.join(chunks)) != re.sub(r'\s+', '', text):
+        return "the chunks do not reassemble to the text"
+    if all(len(word) <= tts.MAX_CHUNK_CHARS for word in text.split()) and " ".join(chunks).split() != text.split():
+        return "the chunks do not reassemble to the words of the text"
+    return None
+
+def check_speech(text, backend, reference, cache):
+    chunks = split_text(text)
+    missing = [chunk for chunk in chunks if cache.get(chunk, 'hi') is None]
+    calls = backend.calls
+    pieces = list(stream_speech(text, cache=cache))
+    # A chunk repeated within the text may be synthesized once or once per copy
+    if not len(set(missing)) <= backend.calls - calls <= len(missing):
+        return f"{backend.calls - calls} backend calls for {len(missing)} chunks not in the cache"
+    if len(pieces) != len(chunks):
+        return f"{len(pieces)} streamed pieces for {len(chunks)} chunks"
+    audio = b''.join(pieces)
+    if audio != b''.join(reference.synthesize(chunk, 'hi') for chunk in chunks):
+        return "the audio is not the chunk audio in order"
+    try:
+        mp3_frames(audio)
+    except ValueError as e:
+        return f"invalid MP3: {e}"
+
+    calls = backend.calls
+    start = time.perf_counter()
+    cached = synthesize_speech(text, cache=cache)
+    seconds = time.perf_counter() - start
+    if backend.calls != calls:
+        return "the second call was not served from the cache"
+    if cached != audio:
+        return "the cached audio differs"
+    return seconds
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline check of the TTS subsystem")
+    parser.add_argument('--texts', type=int, default=100, help="number of texts to check")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the texts")
+    parser.add_argument('--delay', type=float, default=0.01, help="OfflineBackend delay per chunk, in seconds")
+    args = parser.parse_args(argv)
+
+    texts = sample_texts(args.texts, args.seed)
+    backend = OfflineBackend(delay=args.delay)
+    reference = OfflineBackend()
+    previous_backend = get_tts_backend()
+    set_tts_backend(backend)
+
+    # Keep every cache, including the default one of api.text_to_speech_hindi, out of the working tree
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='news-tts-')
+    os.chdir(workdir)
+    cache = TTSCache(cache_dir=os.path.join(workdir, 'check'))
+    try:
+        for i, text in enumerate(texts):
+            problem = check_split(text)
+            if problem:
+                print(f"split_text, text {i}: {problem}")
+                return 1
+
+        cached_seconds = []
+        start = time.perf_counter()
+        for i, text in enumerate(texts):
+            result = check_speech(text, backend, reference, cache)
+            if isinstance(result, str):
+                print(f"synthesize_speech, text {i}: {result}")
+                return 1
+            cached_seconds.append(result)
+        seconds = time.perf_counter() - start
+
+        # api.text_to_speech_hindi goes through the same subsystem
+        audio = api.text_to_speech_hindi(texts[0])
+        if not audio or mp3_frames(audio) == 0:
+            print("api.text_to_speech_hindi returned no audio")
+            return 1
+    finally:
+        set_tts_backend(previous_backend)
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    cached_seconds.sort()
+    print(f"{len(texts)} texts, {backend.calls} backend calls, {seconds:.2f} s")
+    print(f"cached synthesize_speech: p50 {cached_seconds[len(cached_seconds) // 2] * 1000:.3f} ms, "
+          f"max {cached_seconds[-1] * 1000:.3f} ms")
+    print("All TTS checks passed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Seeded synthetic news corpus for the offline benchmarks.
+
+generate_corpus(n, seed) always returns the same n articles for the same
+seed: company news stories built from business vocabulary and words from
+the sentiment lexicon, so summaries, sentiment labels and topics vary the
+way they do on real coverage. A share of the articles are syndicated
+copies of earlier ones (same text, new headline and URL), as when one
+wire story is published by several outlets.
+"""
+import random
+
+COMPANIES = ["Tesla", "Apple", "Google", "Microsoft", "Amazon", "Samsung", "Tata", "Reliance", "Infosys", "TCS"]
+
+SOURCES = ["economictimes.indiatimes.com", "business-standard.com", "livemint.com", "reuters.com", "moneycontrol.com"]
+
+BUSINESS_WORDS = (
+    "revenue profit quarter growth market shares investors analysts demand supply chain production "
+    "factory expansion pricing strategy regulators approval launch product customers margins guidance "
+    "earnings dividend valuation competition partnership acquisition technology software hardware cloud "
+    "services electric vehicles battery semiconductor retail exports imports inflation interest rates"
+).split()
+
+POSITIVE_WORDS = "strong good excellent impressive robust record positive great successful better".split()
+NEGATIVE_WORDS = "weak poor disappointing bad negative terrible worse sluggish difficult uncertain".split()
+FILLER_WORDS = "the a of to in and for with on as at by from that this its their said new".split()
+
+TOPIC_PHRASES = [
+    "Electric Vehicles", "Artificial Intelligence", "Supply Chain", "Quarterly Results", "Stock Market",
+    "Cloud Computing", "Renewable Energy", "Data Privacy", "Global Expansion", "Labor Relations"
+]
+
+HEADLINE_TEMPLATES = [
+    "{company} reports {adjective} quarterly results",
+    "{company} shares move after {topic} news",
+    "{company} announces new {topic} strategy",
+    "Analysts weigh in on {company} {topic} plans",
+    "{company} faces {adjective} outlook on {topic}",
+]
+
+def _sentence(rng, company, tone):
+    """One sentence with the company name, business terms and a sentiment lean"""
+    words = [rng.choice(BUSINESS_WORDS) if rng.random() < 0.6 else rng.choice(FILLER_WORDS) for _ in range(rng.randint(10, 24))]
+    if rng.random() < 0.5:
+        words.insert(rng.randrange(len(words)), company)
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), rng.choice(TOPIC_PHRASES))
+    lexicon = POSITIVE_WORDS if tone > 0 else NEGATIVE_WORDS
+    for _ in range(rng.randint(0, 2) if tone else 0):
+        words.insert(rng.randrange(len(words)), rng.choice(lexicon))
+    sentence = " ".join(words)
+    return sentence[0].upper() + sentence[1:] + "."
+
+def _article_text(rng, company, tone, num_paragraphs):
+    return [
+        " ".join(_sentence(rng, company, tone) for _ in range(rng.randint(3, 6)))
+        for _ in range(num_paragraphs)
+    ]
+
+def generate_corpus(num_articles, seed=0, companies=COMPANIES, duplicate_rate=0.1):
+    """
+    Return num_articles article dicts with id, company, source, title, date,
+    tone (-1, 0 or 1), paragraphs and duplicate_of (the id of the original
+    for syndicated copies, else None). Companies are assigned round-robin.
+    """
+    rng = random.Random(seed)
+    articles = []
+    originals = {company: [] for company in companies}
+    for article_id in range(num_articles):
+        company = companies[article_id % len(companies)]
+        same_company = originals[company]
+        if same_company and rng.random() < duplicate_rate:
+            original = rng.choice(same_company)
+            tone = articles[original]['tone']
+            paragraphs = list(articles[original]['paragraphs'])
+            duplicate_of = original
+        else:
+            tone = rng.choice([-1, 0, 1])
+            paragraphs = _article_text(rng, company, tone, rng.randint(3, 8))
+            duplicate_of = None
+            same_company.append(article_id)
+
+        adjective = {1: rng.choice(POSITIVE_WORDS), -1: rng.choice(NEGATIVE_WORDS), 0: "mixed"}[tone]
+        title = rng.choice(HEADLINE_TEMPLATES).format(company=company, adjective=adjective, topic=rng.choice(TOPIC_PHRASES).lower())
+        articles.append({
+            'id': article_id,
+            'company': company,
+            'source': rng.choice(SOURCES),
+            'title': title[0].upper() + title[1:],
+            'date': f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+            'tone': tone,
+            'paragraphs': paragraphs,
+            'duplicate_of': duplicate_of
+        })
+    return articles
+
+def article_text(article):
+    return " ".join(article['paragraphs'])
+
+def render_article(article):
+    """Article page in the layout of the recorded Economic Times fixture"""
+    paragraphs = "\n".join(f"<p>{paragraph}</p>" for paragraph in article['paragraphs'])
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{article['title']}</title>
+<meta property="article:published_time" content="{article['date']}">
+<script>window.dataLayer = window.dataLayer || [];</script>
+</head>
+<body>
+<nav><ul><li><a href="/">Home</a></li><li><a href="/markets">Markets</a></li></ul></nav>
+<div class="artTitle"><h1>{article['title']}</h1></div>
+<div class="artText">
+{paragraphs}
+</div>
+<footer><p>Copyright 2024 Mock News. All rights reserved. Terms of use and privacy policy apply.</p></footer>
+</body>
+</html>
+"""
+
+def render_search_page(links):
+    """Search result page listing article links, one div.eachStory per result"""
+    items = "\n".join(
+        f'<div class="eachStory"><a href="{href}">{title}</a><p>{title}</p></div>'
+        for href, title in links
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Search results</title></head>
+<body>
+<div class="results">
+{items}
+</div>
+</body>
+</html>
+"""
@@ -0,0 +1,188 @@
+"""
+Local stand-in for the news sites, for benchmarks that must not depend on
+the network.
+
+MockNewsServer serves a synthetic corpus (see corpus.py) on 127.0.0.1:
+
+    /search?q=<company>     search page listing the company's articles
+    /articles/<id>          article page
+    /fixtures/<name>        recorded page from benchmarks/fixtures/
+
+Every response is delayed by `latency` seconds plus up to `jitter` more,
+and a share `error_rate` of the requests fail with `error_status`. Delays
+and failures are drawn from a seeded generator, so a run with the same
+settings sees the same sequence of them.
+
+The pages use the Economic Times markup, but the server's host is not a
+known site, so register an extractor for it before fetching
+(run_benchmarks.register_mock_site does the same):
+
+    from extractors import SiteExtractor, register_extractor, parse_iso_date
+    from html_extract import ArticleRules
+
+    with MockNewsServer(generate_corpus(100), latency=0.05) as server:
+        register_extractor(SiteExtractor(
+            'mock-news', [server.host],
+            listing_selector='div.eachStory',
+            article_rules=ArticleRules(
+                content_containers=[('div', 'artText')],
+                date_meta=[('property', 'article:published_time')],
+                paragraph_fallback=False
+            ),
+            date_parser=parse_iso_date
+        ))
+        fetch_news('Tesla', sources=[server.search_url('Tesla')])
+"""
+import os
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from corpus import render_article, render_search_page
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real sites
+
+    def do_GET(self):
+        server = self.server.news_server
+        delay, failed = server.draw()
+        if delay:
+            time.sleep(delay)
+        if failed:
+            self.send_page(server.error_status, "<html><body><p>Injected error</p></body></html>")
+            return
+
+        parts = urlsplit(self.path)
+        page = None
+        if parts.path.rstrip('/').endswith('/search'):
+            company = parse_qs(parts.query).get('q', [''])[0]
+            page = server.search_page(company)
+        elif parts.path.startswith('/articles/'):
+            page = server.article_page(parts.path[len('/articles/'):])
+        elif parts.path.startswith('/fixtures/'):
+            page = server.fixture_page(parts.path[len('/fixtures/'):])
+
+        if page is None:
+            self.send_page(404, "<html><body><p>Not found</p></body></html>")
+        else:
+            self.send_page(200, page)
+
+    def send_page(self, status, page):
+        body = page.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.news_server.count_request(status)
+
+    def log_message(self, format, *args):
+        pass
+
+class MockNewsServer:
+    """
+    Threaded HTTP server for a corpus, started on a free port in a
+    background thread by start() (or by entering it as a context manager).
+    """
+
+    def __init__(self, articles=(), latency=0.0, jitter=0.0, error_rate=0.0, error_status=500,
+                 seed=0, results_per_page=None, host='127.0.0.1', port=0):
+        self.articles = {str(article['id']): article for article in articles}
+        self.by_company = {}
+        for article in articles:
+            self.by_company.setdefault(article['company'].lower(), []).append(article)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.results_per_page = results_per_page
+        self.host = host
+        self.port = port
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.pages = {}     # Rendered pages, so rendering time is not measured
+        self.httpd = None
+        self.thread = None
+
+    def draw(self):
+        """Delay and whether to fail, for the next request"""
+        with self.lock:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self.error_rate > 0 and self.random.random() < self.error_rate
+        return delay, failed
+
+    def count_request(self, status):
+        with self.lock:
+            self.requests += 1
+            if status >= 500:
+                self.errors += 1
+
+    def _cached(self, key, render):
+        page = self.pages.get(key)
+        if page is None:
+            page = render()
+            self.pages[key] = page
+        return page
+
+    def search_page(self, company):
+        articles = self.by_company.get(company.lower(), [])[:self.results_per_page]
+        return self._cached(('search', company.lower()), lambda: render_search_page(
+            [(f"/articles/{article['id']}", article['title']) for article in articles]
+        ))
+
+    def article_page(self, article_id):
+        article = self.articles.get(article_id)
+        if article is None:
+            return None
+        return self._cached(('article', article_id), lambda: render_article(article))
+
+    def fixture_page(self, name):
+        path = os.path.join(FIXTURES_DIR, os.path.basename(name))
+        if not os.path.isfile(path):
+            return None
+        def read():
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+        return self._cached(('fixture', name), read)
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def search_url(self, company_name):
+        return f"{self.base_url}/search?q={company_name}"
+
+    def article_url(self, article):
+        return f"{self.base_url}/articles/{article['id']}"
+
+    def fixture_url(self, name):
+        return f"{self.base_url}/fixtures/{name}"
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.news_server = self
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.thread.join()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.stop()
+        return False
@@ -0,0 +1,278 @@
+"""
+Offline benchmark suite for the news pipeline.
+
+Generates a seeded synthetic corpus, serves it from a local MockNewsServer
+and reports, for each benchmark, the number of calls, the throughput and
+the p50/p99 latency of a call:
+
+    fetch_news                       one call per company, cold caches
+    extract_article_data             one call per article, cold caches
+    extract_article_data (cached)    the same URLs again, served from the caches
+    parse_article_html               recorded fixture pages
+    generate_summary, analyze_sentiment, extract_topics, calculate_reading_time
+                                     one call per article text
+    analyze_sentiment_batch          all article texts in one call (tokenized per text)
+    generate_comparative_analysis    one call per company
+    translate_to_hindi               one call per company overall summary
+    text_to_speech_hindi             one call per Hindi summary, against tts.OfflineBackend
+                                     with --latency per chunk, cold and then cached
+
+Nothing leaves the machine: the caches are written to a temporary
+directory and only the mock server is contacted. The same --seed gives
+the same corpus, latencies and injected errors, so runs are comparable.
+
+Run from the repository root:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --articles 1000 --latency 0.05 --jitter 0.05 --error-rate 0.02
+    python benchmarks/run_benchmarks.py --json results.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import api
+import network
+import tts
+from extractors import SiteExtractor, register_extractor, parse_iso_date
+from html_extract import ArticleRules
+from resources import warm_resources
+from batch_sentiment import SENTIMENT_TOLERANCE
+from corpus import generate_corpus, article_text
+from mock_server import MockNewsServer, FIXTURES_DIR
+
+MIN_ARTICLES = 10
+MAX_ARTICLES = 10000
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+def result_row(name, latencies, seconds, items=None):
+    items = len(latencies) if items is None else items
+    return {
+        'benchmark': name,
+        'calls': len(latencies),
+        'items': items,
+        'seconds': seconds,
+        'items_per_second': items / seconds if seconds else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000
+    }
+
+def run_timed(func, items, workers=1):
+    """Call func on every item; returns (results, per-call latencies, wall time)"""
+    def timed_call(item):
+        start = time.perf_counter()
+        result = func(item)
+        return result, time.perf_counter() - start
+
+    start = time.perf_counter()
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(timed_call, items))
+    else:
+        outcomes = [timed_call(item) for item in items]
+    seconds = time.perf_counter() - start
+    return [result for result, _ in outcomes], [latency for _, latency in outcomes], seconds
+
+def repeat_timed(func, items, repeat, workers=1, before=None):
+    """run_timed `repeat` times, keeping every latency and the total wall time"""
+    results, latencies, seconds = None, [], 0.0
+    for _ in range(repeat):
+        if before:
+            before()
+        results, run_latencies, run_seconds = run_timed(func, items, workers)
+        latencies += run_latencies
+        seconds += run_seconds
+    return results, latencies, seconds
+
+def check_sentiment(texts, batch_results):
+    """
+    Indexes of the texts whose analyze_sentiment or analyze_sentiment_batch
+    score differs from TextBlob's polarity by more than SENTIMENT_TOLERANCE
+    """
+    from textblob import TextBlob
+    mismatches = []
+    for i, (text, batch_result) in enumerate(zip(texts, batch_results)):
+        expected = TextBlob(text).sentiment.polarity
+        scores = (api.analyze_sentiment(text)['score'], batch_result['score'])
+        if any(abs(score - expected) > SENTIMENT_TOLERANCE for score in scores):
+            mismatches.append(i)
+    return mismatches
+
+def clear_caches():
+    api.article_cache.clear()
+    api.analysis_cache.clear()
+    tts.tts_cache.clear()
+
+def register_mock_site(server):
+    """Route the mock server's pages through an extractor like the Economic Times one"""
+    register_extractor(SiteExtractor(
+        'mock-news', [server.host],
+        listing_selector='div.eachStory',
+        article_rules=ArticleRules(
+            content_containers=[('div', 'artText')],
+            date_meta=[('property', 'article:published_time')],
+            paragraph_fallback=False
+        ),
+        date_parser=parse_iso_date
+    ))
+    # The politeness limits are for real sites
+    network.rate_limiter.set_rate(server.host, 1e6, 1e6)
+
+def run_suite(args):
+    corpus = generate_corpus(args.articles, seed=args.seed, duplicate_rate=args.duplicate_rate)
+    companies = sorted({article['company'] for article in corpus})
+    texts = [article_text(article) for article in corpus]
+    rows = []
+
+    with MockNewsServer(corpus, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        seed=args.seed) as server:
+        register_mock_site(server)
+
+        # Network-bound stages, with the caches emptied before each run
+        results, latencies, seconds = repeat_timed(
+            lambda company: api.fetch_news(
+                company, len(server.by_company[company.lower()]), max_workers=args.workers,
+                sources=[server.search_url(company)]
+            ),
+            companies, args.repeat, before=clear_caches
+        )
+        rows.append(result_row('fetch_news', latencies, seconds, sum(len(r) for r in results) * args.repeat))
+        company_articles = dict(zip(companies, results))
+
+        urls = [(server.article_url(article), article['company']) for article in corpus]
+        extract = lambda item: api.extract_article_data(*item)
+        _, latencies, seconds = repeat_timed(extract, urls, args.repeat, args.workers, before=clear_caches)
+        rows.append(result_row('extract_article_data', latencies, seconds))
+        _, latencies, seconds = repeat_timed(extract, urls, args.repeat, args.workers)
+        rows.append(result_row('extract_article_data (cached)', latencies, seconds))
+        requests, errors = server.requests, server.errors
+
+    fixtures = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.endswith('.html'):
+            with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+                fixtures.append((name, f.read()))
+    _, latencies, seconds = repeat_timed(
+        lambda fixture: api.parse_article_html(fixture[1], f"https://example.com/{fixture[0]}", 'Tesla'),
+        fixtures, args.repeat
+    )
+    rows.append(result_row('parse_article_html', latencies, seconds))
+
+    # NLP functions, one call per article
+    companies_of = [article['company'] for article in corpus]
+    for name, func in [
+        ('generate_summary', lambda i: api.generate_summary(texts[i], companies_of[i])),
+        ('analyze_sentiment', lambda i: api.analyze_sentiment(texts[i])),
+        ('extract_topics', lambda i: api.extract_topics(texts[i], companies_of[i])),
+        ('calculate_reading_time', lambda i: api.calculate_reading_time(texts[i]))
+    ]:
+        _, latencies, seconds = repeat_timed(func, range(len(texts)), args.repeat)
+        rows.append(result_row(name, latencies, seconds))
+
+    batch_results, latencies, seconds = repeat_timed(api.analyze_sentiment_batch, [texts], args.repeat)
+    rows.append(result_row('analyze_sentiment_batch', latencies, seconds, len(texts) * args.repeat))
+    sentiment_mismatches = check_sentiment(texts, batch_results[0])
+
+    analyses, latencies, seconds = repeat_timed(
+        lambda company: api.generate_comparative_analysis(company_articles[company]), companies, args.repeat
+    )
+    rows.append(result_row('generate_comparative_analysis', latencies, seconds))
+
+    summaries = [
+        api.generate_overall_summary(company, company_articles[company], analysis)
+        for company, analysis in zip(companies, analyses)
+    ]
+    hindi_summaries, latencies, seconds = repeat_timed(api.translate_to_hindi, summaries, args.repeat)
+    rows.append(result_row('translate_to_hindi', latencies, seconds))
+
+    # Speech from a local stand-in for the TTS service, with the mock server's latency
+    previous_backend = tts.get_tts_backend()
+    tts.set_tts_backend(tts.OfflineBackend(delay=args.latency))
+    try:
+        _, latencies, seconds = repeat_timed(
+            api.text_to_speech_hindi, hindi_summaries, args.repeat, before=tts.tts_cache.clear
+        )
+        rows.append(result_row('text_to_speech_hindi', latencies, seconds))
+        _, latencies, seconds = repeat_timed(api.text_to_speech_hindi, hindi_summaries, args.repeat)
+        rows.append(result_row('text_to_speech_hindi (cached)', latencies, seconds))
+    finally:
+        tts.set_tts_backend(previous_backend)
+
+    return {
+        'settings': vars(args),
+        'corpus': {'articles': len(corpus), 'companies': len(companies),
+                   'duplicates': sum(1 for article in corpus if article['duplicate_of'] is not None)},
+        'server': {'requests': requests, 'errors': errors},
+        'sentiment_mismatches': sentiment_mismatches,
+        'results': rows
+    }
+
+def print_report(report):
+    corpus, server = report['corpus'], report['server']
+    print(f"Corpus: {corpus['articles']} articles, {corpus['companies']} companies, {corpus['duplicates']} syndicated copies")
+    print(f"Mock server: {server['requests']} requests, {server['errors']} injected errors")
+    print()
+    print(f"{'benchmark':32} {'calls':>7} {'items/s':>11} {'p50 ms':>10} {'p99 ms':>10}")
+    for row in report['results']:
+        print(f"{row['benchmark']:32} {row['calls']:7d} {row['items_per_second']:11.1f} {row['p50_ms']:10.3f} {row['p99_ms']:10.3f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the news pipeline")
+    parser.add_argument('--articles', type=int, default=100, help=f"corpus size ({MIN_ARTICLES}-{MAX_ARTICLES})")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the corpus, latencies and errors")
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help="share of syndicated copies in the corpus")
+    parser.add_argument('--latency', type=float, default=0.0, help="mock server delay per request, in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="extra random delay of up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with HTTP 500")
+    parser.add_argument('--workers', type=int, default=api.DEFAULT_FETCH_WORKERS, help="fetch threads")
+    parser.add_argument('--repeat', type=int, default=1, help="runs of each benchmark")
+    parser.add_argument('--download', action='store_true', help="download missing NLTK data")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args(argv)
+    if not MIN_ARTICLES <= args.articles <= MAX_ARTICLES:
+        parser.error(f"--articles must be between {MIN_ARTICLES} and {MAX_ARTICLES}")
+
+    logging.basicConfig(level=logging.CRITICAL)
+    missing = warm_resources(download=args.download)
+    if missing:
+        print(f"Missing NLTK data: {', '.join(missing)} (install it or pass --download)")
+        return 1
+
+    # Keep the benchmark's caches out of the working tree
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='news-bench-')
+    os.chdir(workdir)
+    try:
+        report = run_suite(args)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if report['sentiment_mismatches']:
+        print(f"Sentiment scores differ from TextBlob by more than {SENTIMENT_TOLERANCE} "
+              f"on {len(report['sentiment_mismatches'])} articles: {report['sentiment_mismatches'][:10]}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
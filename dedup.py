@@ -0,0 +1,164 @@
+"""
+Near-duplicate detection for articles syndicated across news sources.
+
+Every article is reduced to a MinHash signature of its word shingles, so
+copies of the same story with small edits (a different headline, a byline
+or a trailing paragraph) share most of their signature. Signatures are
+split into bands and indexed by band value (locality-sensitive hashing),
+so a lookup only compares against articles that share at least one band
+instead of against every article seen so far.
+"""
+import re
+import zlib
+import logging
+import threading
+from collections import defaultdict
+import numpy as np
+from http_cache import normalize_url
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Hash functions per signature, split into NUM_BANDS bands of equal size
+NUM_PERMUTATIONS = 64
+NUM_BANDS = 16
+
+# Estimated Jaccard similarity of the shingle sets above which two
+# articles are the same story
+DUPLICATE_SIMILARITY = 0.7
+
+SHINGLE_WORD_RE = re.compile(r'\w+')
+
+# Universal hash functions (a * x + b) mod p over 32-bit shingle hashes
+_PRIME = np.uint64(4294967311)
+_rng = np.random.RandomState(20240101)
+_A = _rng.randint(1, 2 ** 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+_B = _rng.randint(0, 2 ** 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of lowercased word n-grams of a text"""
+    words = SHINGLE_WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def minhash(text, size=SHINGLE_SIZE):
+    """MinHash signature (NUM_PERMUTATIONS values) of a text's shingles, or None for empty text"""
+    features = shingles(text, size)
+    if not features:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(feature.encode('utf-8')) for feature in features),
+        dtype=np.uint64,
+        count=len(features)
+    )
+    return ((hashes[:, None] * _A + _B) % _PRIME).min(axis=0)
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    return float(np.mean(a == b))
+
+class DuplicateIndex:
+    """
+    Tracks the URLs and content signatures of accepted articles. Safe to
+    share between fetch threads; use one index per result set.
+
+        duplicates = DuplicateIndex()
+        if duplicates.check(url, content):
+            ...  # first copy of this story, analyze it
+
+    Fetch threads finish in any order, so callers that need the same result
+    on every run pass each article's position in the candidate list: the
+    check for position n waits until positions 0..n-1 have been checked or
+    released, and the earliest-ranked copy of a story is always the one
+    kept. Every position must eventually be checked or released.
+    """
+
+    def __init__(self, threshold=DUPLICATE_SIMILARITY, num_bands=NUM_BANDS):
+        if NUM_PERMUTATIONS % num_bands:
+            raise ValueError(f"num_bands must divide {NUM_PERMUTATIONS}")
+        self.threshold = threshold
+        self.num_bands = num_bands
+        self.rows = NUM_PERMUTATIONS // num_bands
+        self.urls = set()
+        self.signatures = {}
+        self.buckets = defaultdict(list)
+        self.lock = threading.Condition()
+        self.next_position = 0
+        self.released = set()
+
+    def _bands(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.num_bands)]
+
+    def _find(self, signature):
+        checked = set()
+        for band in self._bands(signature):
+            for key in self.buckets.get(band, ()):
+                if key not in checked:
+                    checked.add(key)
+                    if similarity(signature, self.signatures[key]) >= self.threshold:
+                        return key
+        return None
+
+    def check(self, url, content, position=None):
+        """
+        Record an article; returns False if its URL or a near-duplicate of
+        its content was recorded before. The signature is computed before
+        waiting for the turn of `position`.
+        """
+        return self.check_signature(url, minhash(content or ""), position)
+
+    def check_signature(self, url, signature, position=None):
+        """check() for an article whose minhash signature is already known"""
+        key = normalize_url(url)
+        with self.lock:
+            if position is not None:
+                self.lock.wait_for(lambda: self.next_position >= position)
+            try:
+                return self._record(key, url, signature)
+            finally:
+                self._release(position)
+
+    def release(self, position):
+        """Give up the turn of a position that is not checked, e.g. because its download failed"""
+        if position is not None:
+            with self.lock:
+                self._release(position)
+
+    def _release(self, position):
+        if position is None or position < self.next_position:
+            return
+        self.released.add(position)
+        while self.next_position in self.released:
+            self.released.remove(self.next_position)
+            self.next_position += 1
+        self.lock.notify_all()
+
+    def _record(self, key, url, signature):
+        if key in self.urls:
+            return False
+        if signature is not None:
+            original = self._find(signature)
+            if original is not None:
+                logger.info(f"Skipping {url}, a near-duplicate of {original}")
+                metrics.increment('articles_skipped', 'duplicate')
+                return False
+            self.signatures[key] = signature
+            for band in self._bands(signature):
+                self.buckets[band].append(key)
+        self.urls.add(key)
+        return True
+
+def unique_urls(urls):
+    """URLs without repeats, comparing normalized forms and keeping the first spelling"""
+    seen = set()
+    result = []
+    for url in urls:
+        key = normalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            result.append(url)
+    return result
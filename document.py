@@ -0,0 +1,65 @@
+import re
+from functools import cached_property
+from utils import clean_text
+from batch_sentiment import tokenize as sentiment_tokenize
+
+# Candidate topic words: a letter followed by at least two lowercase letters
+TOPIC_WORD_RE = re.compile(r'\b[A-Za-z][a-z]{2,}\b')
+
+# Runs of capitalized words, used as simple named entities
+NAMED_ENTITY_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+
+def sent_tokenize(text):
+    """NLTK's sentence tokenizer, imported on first use"""
+    from nltk.tokenize import sent_tokenize as nltk_sent_tokenize
+    return nltk_sent_tokenize(text)
+
+class Document:
+    """
+    Article text preprocessed for analysis. Every tokenization is computed
+    at most once, on first use, and shared by generate_summary,
+    analyze_sentiment, extract_topics and calculate_reading_time.
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+    @cached_property
+    def sentences(self):
+        """Sentences from NLTK's sentence tokenizer"""
+        return sent_tokenize(self.text)
+
+    @cached_property
+    def lower_sentences(self):
+        return [sentence.lower() for sentence in self.sentences]
+
+    @cached_property
+    def sentence_word_counts(self):
+        return [len(sentence.split()) for sentence in self.sentences]
+
+    @cached_property
+    def words(self):
+        """Whitespace-separated words"""
+        return self.text.split()
+
+    @cached_property
+    def sentiment_tokens(self):
+        """Lowercased tokens as the sentiment lexicon sees them"""
+        return sentiment_tokenize(self.text)
+
+    @cached_property
+    def topic_words(self):
+        return TOPIC_WORD_RE.findall(self.text)
+
+    @cached_property
+    def capitalized_spans(self):
+        return NAMED_ENTITY_RE.findall(self.text)
+
+    @cached_property
+    def cleaned(self):
+        """The text after clean_text"""
+        return clean_text(self.text)
+
+def as_document(text):
+    """Wrap text in a Document unless it already is one"""
+    return text if isinstance(text, Document) else Document(text)
@@ -0,0 +1,159 @@
+"""
+Registry of site extractors, keyed on domain.
+
+A SiteExtractor knows how to build a site's search URL, how to read
+article links from its search result pages (with selectors compiled
+once, on first use), where its articles keep their title, text and date, and how to
+parse its dates. Pages from sites that are not registered use
+GENERIC_EXTRACTOR, which applies the generic article selectors.
+
+To add a news source, register an extractor for it:
+
+    register_extractor(SiteExtractor(
+        'livemint', ['livemint.com'],
+        search_url="https://www.livemint.com/search?q={query}",
+        listing_selector='div.listingNew',
+        article_rules=ArticleRules(content_containers=[('div', 'storyPage')])
+    ))
+"""
+import threading
+from datetime import datetime
+from functools import cached_property
+from urllib.parse import urljoin, urlsplit, parse_qs
+from html_extract import ArticleRules, GENERIC_RULES, DEFAULT_BACKEND, extract_article_fields
+from utils import format_date
+
+def parse_iso_date(date_str):
+    """Parse ISO 8601 dates with a timezone (as in article:published_time), else use format_date"""
+    try:
+        return datetime.fromisoformat(date_str.strip()).strftime('%Y-%m-%d')
+    except ValueError:
+        return format_date(date_str)
+
+class SiteExtractor:
+    """
+    Search, link and article extraction for one news site.
+
+    - domains: hosts handled by this extractor, subdomains included
+    - search_url: search page for a company, with a {query} placeholder
+    - listing_selector: CSS selector of one search result; its first <a>
+      links to the article
+    - article_rules: html_extract.ArticleRules for the site's article pages;
+      pages they find no text on are retried with the generic rules
+    - date_parser: turns the raw date string into YYYY-MM-DD
+    """
+
+    def __init__(self, name, domains=(), search_url=None, listing_selector=None,
+                 article_rules=GENERIC_RULES, date_parser=format_date):
+        self.name = name
+        self.domains = tuple(domain.lower() for domain in domains)
+        self.search_url = search_url
+        self.listing_selector = listing_selector
+        self.article_rules = article_rules
+        self.date_parser = date_parser
+
+    @cached_property
+    def listing(self):
+        import soupsieve
+        return soupsieve.compile(self.listing_selector)
+
+    def handles(self, host):
+        return any(host == domain or host.endswith('.' + domain) for domain in self.domains)
+
+    def search_url_for(self, company_name):
+        return self.search_url.format(query=company_name) if self.search_url else None
+
+    def is_listing(self, url):
+        """Whether a URL is a search result page rather than an article"""
+        return self.listing_selector is not None and urlsplit(url).path.rstrip('/').endswith('/search')
+
+    def resolve_link(self, page_url, href):
+        return urljoin(page_url, href)
+
+    def extract_links(self, html, page_url):
+        """Article URLs listed on a search result page"""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+        links = []
+        for item in self.listing.select(soup):
+            link_elem = item.find('a')
+            if link_elem and link_elem.get('href'):
+                link = self.resolve_link(page_url, link_elem['href'])
+                if link:
+                    links.append(link)
+        return links
+
+    def extract_article(self, html, backend=DEFAULT_BACKEND):
+        """(title, content, raw date) of an article page"""
+        title, content, date = extract_article_fields(html, backend, self.article_rules)
+        if not content and self.article_rules is not GENERIC_RULES:
+            title, content, date = extract_article_fields(html, backend, GENERIC_RULES)
+        return title, content, date
+
+    def parse_date(self, date_str):
+        return self.date_parser(date_str)
+
+class GoogleNewsExtractor(SiteExtractor):
+    """Google News results, whose links go through /url?q=<article> redirects"""
+
+    def resolve_link(self, page_url, href):
+        link = urljoin(page_url, href)
+        parts = urlsplit(link)
+        if parts.path == '/url':
+            query = parse_qs(parts.query)
+            targets = query.get('q') or query.get('url')
+            return targets[0] if targets else None
+        return link
+
+GENERIC_EXTRACTOR = SiteExtractor('generic')
+
+_extractors = []
+_extractors_lock = threading.Lock()
+
+def register_extractor(extractor):
+    """Add a site extractor; sites are searched in registration order"""
+    with _extractors_lock:
+        _extractors.append(extractor)
+    return extractor
+
+def get_extractors():
+    return list(_extractors)
+
+def get_extractor(url):
+    """The extractor registered for a URL's host, or GENERIC_EXTRACTOR"""
+    host = (urlsplit(url).hostname or '').lower()
+    for extractor in _extractors:
+        if extractor.handles(host):
+            return extractor
+    return GENERIC_EXTRACTOR
+
+register_extractor(GoogleNewsExtractor(
+    'google-news', ['google.com'],
+    search_url="https://www.google.com/search?q={query}+news&tbm=nws",
+    listing_selector='div.SoaBEf'
+))
+
+register_extractor(SiteExtractor(
+    'economictimes', ['economictimes.indiatimes.com'],
+    search_url="https://economictimes.indiatimes.com/search?q={query}",
+    listing_selector='div.eachStory',
+    article_rules=ArticleRules(
+        content_containers=[('div', 'artText')],
+        date_meta=[('property', 'article:published_time')],
+        date_selectors=[('time', None)],
+        paragraph_fallback=False
+    ),
+    date_parser=parse_iso_date
+))
+
+register_extractor(SiteExtractor(
+    'business-standard', ['business-standard.com'],
+    search_url="https://www.business-standard.com/search?q={query}",
+    listing_selector='div.listing-main',
+    article_rules=ArticleRules(
+        content_containers=[('div', 'story-content')],
+        date_meta=[('property', 'article:published_time'), ('name', 'publish-date')],
+        paragraph_fallback=False
+    ),
+    date_parser=parse_iso_date
+))
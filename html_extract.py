@@ -0,0 +1,476 @@
+"""
+Extraction of the title, body text and publication date of an article page.
+
+The default "htmlparser" backend makes one pass over the page with the
+standard library's html.parser and keeps only the text of the headline,
+the paragraphs and the date tags; no tree is built. It opens and closes
+elements exactly as BeautifulSoup's html.parser tree builder does, so it
+gives the same results as the original BeautifulSoup extractor ("bs4"
+backend, used when it fails on a page), malformed markup included.
+
+The "lxml" backend streams the page through lxml's pull parser, clearing
+every element as soon as it is no longer needed. It is the fastest, but
+libxml2 repairs malformed markup differently from html.parser, e.g. an
+unclosed <p> followed by another <p>: html.parser nests the second
+paragraph inside the first, lxml closes the first one, and a <p> inside
+an <h1> ends the heading. Use it only for sites with clean markup.
+
+Which elements are looked at is described by an ArticleRules object; sites
+with a known layout pass narrower rules (see extractors.py) and
+GENERIC_RULES covers every other page.
+"""
+import re
+import logging
+from collections import Counter
+from functools import cached_property
+from html.parser import HTMLParser
+from html.entities import html5
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = 'htmlparser'
+
+# Characters fed to the pull parser at a time
+FEED_CHUNK_SIZE = 64 * 1024
+
+# Paragraphs outside the article containers must be longer than this
+MIN_PARAGRAPH_LENGTH = 50
+
+# Tags whose strings BeautifulSoup stores with their own string type;
+# get_text() of any other tag leaves them out
+SKIPPED_TEXT_TAGS = frozenset(['rt', 'rp', 'script', 'style', 'template'])
+
+# Tags BeautifulSoup closes as soon as they are opened
+VOID_TAGS = frozenset([
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image', 'img',
+    'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer',
+    'track', 'wbr'
+])
+
+# Tags in which BeautifulSoup keeps whitespace-only strings as they are
+PRESERVE_WHITESPACE_TAGS = frozenset(['pre', 'textarea'])
+
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+# Named character references, without the trailing semicolon
+HTML_ENTITIES = {name.rstrip(';'): character for name, character in html5.items()}
+
+_DECIMAL_REFERENCE = re.compile("^([0-9]+)(.*)")
+_HEX_REFERENCE = re.compile("^([0-9a-f]+)(.*)")
+
+# String type of CDATA sections, which get_text() keeps
+CDATA = '#cdata'
+
+def _css(selector):
+    tag, css_class = selector
+    return f"{tag or ''}.{css_class}" if css_class else tag
+
+class ArticleRules:
+    """
+    Where the title, text and date of an article are found. Selectors are
+    (tag, class) pairs, with None matching any tag or class, and are tried
+    in order; the BeautifulSoup versions are compiled once, on first use.
+
+    - use_h1: the first <h1> is the title when the page has one
+    - title_selectors: title elements tried when there is no <h1>
+    - content_containers: the text is the <p> descendants of the first
+      container type found on the page
+    - date_meta: (attribute, value) of <meta> tags with the date in 'content'
+    - date_selectors: date elements tried after the meta tags
+    - paragraph_fallback: without a container, use every <p> longer than
+      MIN_PARAGRAPH_LENGTH
+    """
+
+    def __init__(self, use_h1=True, title_selectors=(), content_containers=(), date_meta=(),
+                 date_selectors=(), paragraph_fallback=True):
+        self.use_h1 = use_h1
+        self.title_selectors = list(title_selectors)
+        self.content_containers = list(content_containers)
+        self.date_meta = list(date_meta)
+        self.date_selectors = list(date_selectors)
+        self.paragraph_fallback = paragraph_fallback
+
+    @cached_property
+    def compiled(self):
+        """soupsieve selectors for the titles, the content paragraphs and the dates"""
+        import soupsieve
+        titles = [soupsieve.compile(_css(selector)) for selector in self.title_selectors]
+        content = [soupsieve.compile(f"{_css(selector)} p") for selector in self.content_containers]
+        dates = (
+            [soupsieve.compile(f'meta[{attribute}="{value}"]') for attribute, value in self.date_meta]
+            + [soupsieve.compile(_css(selector)) for selector in self.date_selectors]
+        )
+        return titles, content, dates
+
+# Selectors of the original extractor, for pages of unknown layout
+GENERIC_RULES = ArticleRules(
+    title_selectors=[('div', 'headline'), (None, 'article-title'), (None, 'story-headline')],
+    content_containers=[('div', 'artText'), ('div', 'story-content'), ('article', None), (None, 'article-content')],
+    date_meta=[('property', 'article:published_time'), ('name', 'publish-date')],
+    date_selectors=[(None, 'date'), (None, 'article-date'), ('time', None)]
+)
+
+def _matches(tag, classes, selector):
+    selector_tag, selector_class = selector
+    return (selector_tag is None or tag == selector_tag) and (selector_class is None or selector_class in classes)
+
+def _element_text(element):
+    """Text of an element and its descendants, like BeautifulSoup's get_text()"""
+    parts = []
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in SKIPPED_TEXT_TAGS:
+            parts.append(_element_text(child))
+        if child.tail:
+            parts.append(child.tail)
+    return ''.join(parts)
+
+def _character_reference(name):
+    """(character, data after it) of a numeric character reference, resolved as BeautifulSoup does"""
+    base, pattern = 10, _DECIMAL_REFERENCE
+    if name.startswith(('x', 'X')):
+        name, base, pattern = name[1:], 16, _HEX_REFERENCE
+    try:
+        code, extra = int(name, base), ''
+    except ValueError:
+        match = pattern.search(name)
+        if match is None:
+            return '', name
+        code, extra = int(match.group(1), base), match.group(2)
+    if code == 0 or code > 0x10ffff or 0xd800 <= code <= 0xdfff:
+        return '\ufffd', extra
+    if 0x80 <= code <= 0x9f:
+        # Windows-1252 characters written as numeric references
+        try:
+            return bytes([code]).decode('cp1252'), extra
+        except UnicodeDecodeError:
+            pass
+    return chr(code), extra
+
+class _ArticleParser(HTMLParser):
+    """
+    Collects the text the rules need in one html.parser pass. Elements are
+    opened and closed the way BeautifulSoup's html.parser tree builder does
+    it (void elements close at once, an end tag closes every element up to
+    the last one with its name and is ignored when none is open), and
+    strings are merged and collapsed the same way, so the text captured for
+    an element is what get_text() returns for it.
+    """
+
+    def __init__(self, rules):
+        super().__init__(convert_charrefs=False)
+        self.rules = rules
+        self.stack = []             # (tag, containers opened, captures opened) per open element
+        self.open_tags = Counter()
+        self.open_containers = [0] * len(rules.content_containers)
+        self.string_containers = [] # Open SKIPPED_TEXT_TAGS, innermost last
+        self.preserve_whitespace = 0
+        self.captures = []          # (string types, text parts) of the open elements whose text is needed
+        self.data = []
+        self.already_closed = []
+
+        self.h1 = None
+        self.titles = [None] * len(rules.title_selectors)
+        self.paragraphs = []        # (text parts, containers the paragraph is in)
+        self.date_meta = [None] * len(rules.date_meta)
+        self.dates = [None] * len(rules.date_selectors)
+
+    def capture(self, tag):
+        parts = []
+        self.captures.append(((tag,) if tag in SKIPPED_TEXT_TAGS else (None, CDATA), parts))
+        return parts
+
+    def end_data(self, cdata=False):
+        if not self.data:
+            return
+        text = ''.join(self.data)
+        self.data = []
+        if not self.preserve_whitespace and not text.strip(ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+        string_type = CDATA if cdata else (self.string_containers[-1] if self.string_containers else None)
+        for string_types, parts in self.captures:
+            if string_type in string_types:
+                parts.append(text)
+
+    def handle_starttag(self, tag, attrs, close_void=True):
+        self.end_data()
+        attributes = {}
+        for name, value in attrs:
+            attributes[name] = '' if value is None else value
+        classes = attributes.get('class', '').split()
+        rules = self.rules
+        captures = len(self.captures)
+
+        if tag == 'h1' and rules.use_h1 and self.h1 is None:
+            self.h1 = self.capture(tag)
+        for i, selector in enumerate(rules.title_selectors):
+            if self.titles[i] is None and _matches(tag, classes, selector):
+                self.titles[i] = self.capture(tag)
+        if tag == 'p':
+            self.paragraphs.append((self.capture(tag), tuple(count > 0 for count in self.open_containers)))
+        if tag == 'meta':
+            for i, (attribute, value) in enumerate(rules.date_meta):
+                if self.date_meta[i] is None and attributes.get(attribute) == value:
+                    self.date_meta[i] = attributes.get('content') or ''
+        for i, selector in enumerate(rules.date_selectors):
+            if self.dates[i] is None and _matches(tag, classes, selector):
+                self.dates[i] = attributes.get('content') or self.capture(tag)
+
+        opened = [i for i, selector in enumerate(rules.content_containers) if _matches(tag, classes, selector)]
+        for i in opened:
+            self.open_containers[i] += 1
+        self.stack.append((tag, opened, len(self.captures) - captures))
+        self.open_tags[tag] += 1
+        if tag in SKIPPED_TEXT_TAGS:
+            self.string_containers.append(tag)
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_whitespace += 1
+
+        if close_void and tag in VOID_TAGS:
+            self.handle_endtag(tag, check_already_closed=False)
+            self.already_closed.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, close_void=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        # The end tag of a void element that was already closed
+        if check_already_closed and tag in self.already_closed:
+            self.already_closed.remove(tag)
+            return
+        self.end_data()
+        if not self.open_tags[tag]:
+            return
+        while self.pop() != tag:
+            pass
+
+    def pop(self):
+        tag, opened, captures = self.stack.pop()
+        self.open_tags[tag] -= 1
+        for i in opened:
+            self.open_containers[i] -= 1
+        if captures:
+            del self.captures[-captures:]
+        if tag in SKIPPED_TEXT_TAGS:
+            self.string_containers.pop()
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_whitespace -= 1
+        return tag
+
+    def handle_data(self, data):
+        self.data.append(data)
+
+    def handle_charref(self, name):
+        character, extra = _character_reference(name)
+        self.data += [character, extra]
+
+    def handle_entityref(self, name):
+        character = HTML_ENTITIES.get(name)
+        self.data.append(character if character is not None else f"&{name}")
+
+    # Comments, doctypes, declarations and processing instructions end the
+    # current string and have no text of their own
+    def handle_comment(self, data):
+        self.end_data()
+
+    def handle_decl(self, decl):
+        self.end_data()
+
+    def handle_pi(self, data):
+        self.end_data()
+
+    def unknown_decl(self, data):
+        self.end_data()
+        if data.upper().startswith('CDATA['):
+            self.data.append(data[len('CDATA['):])
+            self.end_data(cdata=True)
+
+def _extract_htmlparser(html, rules):
+    parser = _ArticleParser(rules)
+    parser.feed(html)
+    parser.close()
+    parser.end_data()
+
+    if parser.h1 is not None:
+        title = ''.join(parser.h1).strip()
+    else:
+        # An empty title element counts as no title
+        title = next((''.join(parts).strip() for parts in parser.titles if parts is not None), None) or None
+
+    paragraphs = [(''.join(parts).strip(), containers) for parts, containers in parser.paragraphs]
+    content = ""
+    for i in range(len(rules.content_containers)):
+        elements = [text for text, containers in paragraphs if containers[i]]
+        if elements:
+            content = ' '.join(elements)
+            break
+    if not content and rules.paragraph_fallback:
+        content = ' '.join([text for text, _ in paragraphs if len(text) > MIN_PARAGRAPH_LENGTH])
+
+    date = next((value for value in parser.date_meta + parser.dates if value is not None), None)
+    if isinstance(date, list):
+        date = ''.join(date).strip()
+    return title, content, date
+
+def _extract_lxml(html, rules):
+    parser = etree.HTMLPullParser(events=('start', 'end'))
+    open_containers = [0] * len(rules.content_containers)
+    stack = []          # (containers opened, roles) per open element
+    open_captures = 0   # Open elements whose text is still needed
+
+    h1_text = None
+    title_texts = [None] * len(rules.title_selectors)
+    paragraphs = []     # (text, containers the paragraph is in)
+    date_meta = [None] * len(rules.date_meta)
+    date_values = [None] * len(rules.date_selectors)
+
+    def handle(event, element):
+        nonlocal open_captures, h1_text
+        if event == 'start':
+            tag = element.tag if isinstance(element.tag, str) else None
+            classes = element.get('class', '').split()
+            roles = []
+            if tag == 'h1' and rules.use_h1 and h1_text is None:
+                h1_text = ''
+                roles.append(('h1', None))
+            for i, selector in enumerate(rules.title_selectors):
+                if title_texts[i] is None and _matches(tag, classes, selector):
+                    title_texts[i] = ''
+                    roles.append(('title', i))
+            if tag == 'p':
+                # Keep document order when paragraphs are nested
+                roles.append(('p', len(paragraphs)))
+                paragraphs.append(['', tuple(count > 0 for count in open_containers)])
+            if tag == 'meta':
+                for i, (attribute, value) in enumerate(rules.date_meta):
+                    if date_meta[i] is None and element.get(attribute) == value:
+                        date_meta[i] = element.get('content') or ''
+            for i, selector in enumerate(rules.date_selectors):
+                if date_values[i] is None and _matches(tag, classes, selector):
+                    date_values[i] = element.get('content') or ''
+                    if not date_values[i]:
+                        roles.append(('date', i))
+
+            opened = [i for i, selector in enumerate(rules.content_containers) if _matches(tag, classes, selector)]
+            for i in opened:
+                open_containers[i] += 1
+            if roles:
+                open_captures += 1
+            stack.append((opened, roles))
+            return
+
+        opened, roles = stack.pop()
+        for i in opened:
+            open_containers[i] -= 1
+        if roles:
+            open_captures -= 1
+            text = _element_text(element)
+            for role, value in roles:
+                if role == 'h1':
+                    h1_text = text
+                elif role == 'title':
+                    title_texts[value] = text
+                elif role == 'p':
+                    paragraphs[value][0] = text.strip()
+                else:
+                    date_values[value] = text.strip()
+
+        # Nothing outside an open capture is needed again
+        if not open_captures:
+            element.clear()
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+
+    for start in range(0, len(html), FEED_CHUNK_SIZE):
+        parser.feed(html[start:start + FEED_CHUNK_SIZE])
+        for event, element in parser.read_events():
+            handle(event, element)
+    parser.close()
+    for event, element in parser.read_events():
+        handle(event, element)
+
+    if h1_text is not None:
+        title = h1_text.strip()
+    else:
+        # An empty title element counts as no title
+        title = next((text.strip() for text in title_texts if text is not None), None) or None
+
+    content = ""
+    for i in range(len(rules.content_containers)):
+        elements = [text for text, containers in paragraphs if containers[i]]
+        if elements:
+            content = ' '.join(elements)
+            break
+    if not content and rules.paragraph_fallback:
+        content = ' '.join([text for text, _ in paragraphs if len(text) > MIN_PARAGRAPH_LENGTH])
+
+    date = next((value for value in date_meta + date_values if value is not None), None)
+    return title, content, date
+
+def _extract_bs4(html, rules):
+    from bs4 import BeautifulSoup
+    compiled_titles, compiled_content, compiled_dates = rules.compiled
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Extract title
+    title = soup.find('h1') if rules.use_h1 else None
+    if title:
+        title = title.get_text().strip()
+    else:
+        for selector in compiled_titles:
+            candidate = selector.select_one(soup)
+            if candidate:
+                title = candidate.get_text().strip() or None
+                break
+
+    # Extract article content
+    content = ""
+    for selector in compiled_content:
+        elements = selector.select(soup)
+        if elements:
+            content = ' '.join([p.get_text().strip() for p in elements])
+            break
+
+    if not content and rules.paragraph_fallback:
+        paragraphs = soup.find_all('p')
+        content = ' '.join([p.get_text().strip() for p in paragraphs if len(p.get_text().strip()) > MIN_PARAGRAPH_LENGTH])
+
+    # Extract date
+    date = None
+    for selector in compiled_dates:
+        element = selector.select_one(soup)
+        if element:
+            if element.get('content'):
+                date = element.get('content')
+            else:
+                date = element.get_text().strip()
+            break
+
+    return title, content, date
+
+def extract_article_fields(html, backend=DEFAULT_BACKEND, rules=GENERIC_RULES):
+    """
+    Return (title, content, date) of an article page. title is None when
+    the page has no headline and date is the raw, unformatted date string
+    or None.
+    """
+    if backend == 'htmlparser':
+        try:
+            return _extract_htmlparser(html, rules)
+        except Exception as e:
+            logger.error(f"html.parser extraction failed, falling back to BeautifulSoup: {e}")
+    elif backend == 'lxml' and etree is not None:
+        try:
+            return _extract_lxml(html, rules)
+        except Exception as e:
+            logger.error(f"lxml extraction failed, falling back to BeautifulSoup: {e}")
+    return _extract_bs4(html, rules)
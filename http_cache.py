@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import Counter
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid')
+
+# Prefix of the temporary files of write_atomic
+TMP_PREFIX = '.tmp-'
+
+def normalize_url(url):
+    """
+    Normalize a URL for use as a cache key: lowercase scheme and host,
+    drop default ports, fragments and tracking parameters, sort the query.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    ]
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(sorted(query)), ""))
+
+def write_atomic(path, data):
+    """Write bytes to path via a temporary file so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=TMP_PREFIX)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class HttpCache:
+    """
+    Persistent HTTP response cache.
+
+    Response bodies are stored content-addressed under bodies/<sha256>, so
+    identical pages reached through different URLs share one file. Each
+    normalized URL has a small metadata record under meta/ with the body
+    hash, ETag, Last-Modified and fetch time, used for conditional
+    revalidation. A body is deleted as soon as no metadata record refers
+    to it. When the bodies exceed max_bytes, the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, cache_dir=os.path.join('cache', 'http'), max_bytes=200 * 1024 * 1024, fresh_for=3600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fresh_for = fresh_for  # Seconds an entry is served without revalidation
+        self.meta_dir = os.path.join(cache_dir, 'meta')
+        self.body_dir = os.path.join(cache_dir, 'bodies')
+        self.lock = threading.Lock()
+        self.total_bytes = None  # Computed lazily on first write
+        self.refcounts = None  # Metadata records per body hash, computed lazily on first write
+
+    def _ensure_dirs(self):
+        os.makedirs(self.meta_dir, exist_ok=True)
+        os.makedirs(self.body_dir, exist_ok=True)
+
+    def _meta_path(self, url):
+        key = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.meta_dir, f"{key}.json")
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.body_dir, body_hash)
+
+    def get(self, url):
+        """
+        Return the cached entry for a URL as a dict with 'body' (bytes),
+        'etag', 'last_modified', 'encoding' and 'fetched_at', or None
+        """
+        meta_path = self._meta_path(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(self._body_path(entry['body_hash']), 'rb') as f:
+                entry['body'] = f.read()
+            os.utime(meta_path)  # Mark as recently used
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading HTTP cache entry for {url}: {e}")
+            return None
+
+    def is_fresh(self, entry):
+        """Check whether an entry can be served without revalidation"""
+        return time.time() - entry['fetched_at'] < self.fresh_for
+
+    def put(self, url, body, etag=None, last_modified=None, encoding=None):
+        """Store a response body and its validators for a URL"""
+        body_hash = hashlib.sha256(body).hexdigest()
+        entry = {
+            'url': normalize_url(url),
+            'body_hash': body_hash,
+            'etag': etag,
+            'last_modified': last_modified,
+            'encoding': encoding,
+            'size': len(body),
+            'fetched_at': time.time()
+        }
+        try:
+            with self.lock:
+                self._ensure_dirs()
+                if self.total_bytes is None:
+                    self.total_bytes = self._scan_size()
+                if self.refcounts is None:
+                    self.refcounts = self._scan_refcounts()
+                body_path = self._body_path(body_hash)
+                if not os.path.exists(body_path):
+                    write_atomic(body_path, body)
+                    self.total_bytes += len(body)
+                meta_path = self._meta_path(url)
+                old_hash = self._read_body_hash(meta_path)
+                write_atomic(meta_path, json.dumps(entry).encode('utf-8'))
+                if old_hash != body_hash:
+                    self.refcounts[body_hash] += 1
+                    if old_hash:
+                        self._release_body(old_hash)
+                if self.total_bytes > self.max_bytes:
+                    self._evict()
+        except Exception as e:
+            logger.error(f"Error writing HTTP cache entry for {url}: {e}")
+
+    def touch(self, url, entry):
+        """Record a successful revalidation (304) of a cached entry"""
+        record = {key: value for key, value in entry.items() if key != 'body'}
+        record['fetched_at'] = time.time()
+        try:
+            write_atomic(self._meta_path(url), json.dumps(record).encode('utf-8'))
+        except Exception as e:
+            logger.error(f"Error updating HTTP cache entry for {url}: {e}")
+
+    def _scan_size(self):
+        return sum(
+            entry.stat().st_size for entry in os.scandir(self.body_dir)
+            if entry.is_file() and not entry.name.startswith(TMP_PREFIX)
+        )
+
+    def _read_body_hash(self, meta_path):
+        """Body hash of a metadata record, or None if there is no readable record"""
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)['body_hash']
+        except Exception:
+            return None
+
+    def _scan_refcounts(self):
+        return Counter(
+            self._read_body_hash(meta.path) for meta in os.scandir(self.meta_dir) if meta.name.endswith('.json')
+        )
+
+    def _release_body(self, body_hash):
+        """Drop one reference to a body, deleting the body file with the last one"""
+        self.refcounts[body_hash] -= 1
+        if self.refcounts[body_hash] > 0:
+            return
+        del self.refcounts[body_hash]
+        body_path = self._body_path(body_hash)
+        if os.path.exists(body_path):
+            self.total_bytes -= os.path.getsize(body_path)
+            os.remove(body_path)
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is 10% under its cap"""
+        target = self.max_bytes * 0.9
+        metas = sorted(
+            (entry for entry in os.scandir(self.meta_dir) if entry.name.endswith('.json')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+
+        body_hashes = {meta.path: self._read_body_hash(meta.path) for meta in metas}
+        refcounts = Counter(body_hashes.values())
+
+        for meta in metas:
+            if self.total_bytes <= target:
+                break
+            body_hash = body_hashes[meta.path]
+            os.remove(meta.path)
+            refcounts[body_hash] -= 1
+            if body_hash and refcounts[body_hash] == 0:
+                body_path = self._body_path(body_hash)
+                if os.path.exists(body_path):
+                    self.total_bytes -= os.path.getsize(body_path)
+                    os.remove(body_path)
+
+        # Remove bodies no metadata record points to any more
+        for body in os.scandir(self.body_dir):
+            if body.is_file() and not body.name.startswith(TMP_PREFIX) and refcounts[body.name] <= 0:
+                self.total_bytes -= body.stat().st_size
+                os.remove(body.path)
+        self.refcounts = +refcounts
+
+    def clear(self):
+        """Remove every cached response"""
+        with self.lock:
+            for directory in (self.meta_dir, self.body_dir):
+                if os.path.isdir(directory):
+                    for entry in os.scandir(directory):
+                        os.remove(entry.path)
+            self.total_bytes = 0
+            self.refcounts = Counter()
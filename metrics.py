@@ -0,0 +1,243 @@
+"""
+Pipeline instrumentation: per-stage call counts and latency histograms,
+bytes downloaded, cache hit/miss counts and failure reasons.
+
+Recording is off until enable() is called. While disabled every recording
+function returns right after checking one flag and stage() hands out a
+shared no-op context manager, so instrumented code costs next to nothing.
+
+    metrics.enable()
+    with metrics.stage('parse'):
+        ...
+    metrics.summary()            # per-stage dicts for Python callers
+    metrics.prometheus_text()    # Prometheus text exposition format
+
+Metrics are kept per process; analysis pool workers record their own.
+"""
+import math
+import time
+import bisect
+import functools
+import threading
+from collections import defaultdict
+
+# Pipeline stages, in the order they run
+STAGES = [
+    'search_fetch', 'article_fetch', 'parse', 'summarize', 'sentiment', 'topics',
+    'tts', 'comparative_analysis'
+]
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_PREFIX = 'news'
+
+_enabled = False
+_lock = threading.Lock()
+
+class _Histogram:
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # Last one is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (math.inf,), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+_latency = defaultdict(_Histogram)      # stage -> histogram
+_failures = defaultdict(int)            # (stage, reason) -> count
+_bytes = defaultdict(int)               # stage -> bytes
+_cache = defaultdict(int)               # (cache, result) -> count
+_counters = defaultdict(int)            # (name, label) -> count
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    """Forget everything recorded so far"""
+    with _lock:
+        for store in (_latency, _failures, _bytes, _cache, _counters):
+            store.clear()
+
+def observe(stage_name, seconds):
+    """Record the duration of one call of a stage"""
+    if _enabled:
+        with _lock:
+            _latency[stage_name].observe(seconds)
+
+def record_failure(stage_name, reason):
+    if _enabled:
+        with _lock:
+            _failures[(stage_name, reason)] += 1
+
+def add_bytes(stage_name, num_bytes):
+    if _enabled:
+        with _lock:
+            _bytes[stage_name] += num_bytes
+
+def record_cache(cache_name, hit):
+    """Count a lookup in a cache ('http', 'analysis', 'tts', ...)"""
+    if _enabled:
+        with _lock:
+            _cache[(cache_name, 'hit' if hit else 'miss')] += 1
+
+def increment(name, label='', value=1):
+    """Count an event that is neither a failure nor a cache lookup"""
+    if _enabled:
+        with _lock:
+            _counters[(name, label)] += value
+
+class _StageTimer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        observe(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            record_failure(self.name, exc_type.__name__)
+        return False
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+_NOOP_TIMER = _NoopTimer()
+
+def stage(name):
+    """
+    Context manager timing a stage. Exceptions are recorded as failures
+    (with the exception class as reason) and re-raised.
+    """
+    return _StageTimer(name) if _enabled else _NOOP_TIMER
+
+def timed(name):
+    """Decorator form of stage()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _StageTimer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def summary():
+    """
+    Per-stage metrics as a list of dicts (stage, calls, total_seconds,
+    mean_ms, p50_ms, p95_ms, failures, bytes) plus cache hit rates and
+    other counters:
+
+        {'stages': [...], 'caches': {name: {'hits', 'misses', 'hit_rate'}},
+         'failures': {(stage, reason): count}, 'counters': {(name, label): count}}
+    """
+    with _lock:
+        names = [name for name in STAGES if name in _latency or name in _bytes]
+        names += sorted(name for name in set(_latency) | set(_bytes) if name not in STAGES)
+        stages = []
+        for name in names:
+            histogram = _latency.get(name) or _Histogram()
+            stages.append({
+                'stage': name,
+                'calls': histogram.count,
+                'total_seconds': histogram.total,
+                'mean_ms': histogram.total / histogram.count * 1000 if histogram.count else 0.0,
+                'p50_ms': histogram.quantile(0.5) * 1000,
+                'p95_ms': histogram.quantile(0.95) * 1000,
+                'failures': sum(count for (stage_name, _), count in _failures.items() if stage_name == name),
+                'bytes': _bytes.get(name, 0)
+            })
+
+        caches = {}
+        for cache_name in sorted({cache_name for cache_name, _ in _cache}):
+            hits = _cache.get((cache_name, 'hit'), 0)
+            misses = _cache.get((cache_name, 'miss'), 0)
+            caches[cache_name] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / (hits + misses) if hits + misses else 0.0
+            }
+
+        return {
+            'stages': stages,
+            'caches': caches,
+            'failures': dict(_failures),
+            'counters': dict(_counters)
+        }
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_bound(bound):
+    return '+Inf' if bound == math.inf else repr(bound)
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format"""
+    prefix = METRIC_PREFIX
+    lines = []
+    with _lock:
+        lines.append(f"# HELP {prefix}_stage_seconds Duration of pipeline stage calls.")
+        lines.append(f"# TYPE {prefix}_stage_seconds histogram")
+        for name, histogram in sorted(_latency.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (math.inf,), histogram.counts):
+                cumulative += count
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{_escape(name)}",le="{_format_bound(bound)}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{_escape(name)}"}} {histogram.total!r}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{_escape(name)}"}} {histogram.count}')
+
+        lines.append(f"# HELP {prefix}_stage_failures_total Failed pipeline stage calls by reason.")
+        lines.append(f"# TYPE {prefix}_stage_failures_total counter")
+        for (name, reason), count in sorted(_failures.items()):
+            lines.append(f'{prefix}_stage_failures_total{{stage="{_escape(name)}",reason="{_escape(reason)}"}} {count}')
+
+        lines.append(f"# HELP {prefix}_downloaded_bytes_total Bytes downloaded by stage.")
+        lines.append(f"# TYPE {prefix}_downloaded_bytes_total counter")
+        for name, num_bytes in sorted(_bytes.items()):
+            lines.append(f'{prefix}_downloaded_bytes_total{{stage="{_escape(name)}"}} {num_bytes}')
+
+        lines.append(f"# HELP {prefix}_cache_requests_total Cache lookups by cache and result.")
+        lines.append(f"# TYPE {prefix}_cache_requests_total counter")
+        for (cache_name, result), count in sorted(_cache.items()):
+            lines.append(f'{prefix}_cache_requests_total{{cache="{_escape(cache_name)}",result="{result}"}} {count}')
+
+        lines.append(f"# HELP {prefix}_events_total Other pipeline events.")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for (name, label), count in sorted(_counters.items()):
+            lines.append(f'{prefix}_events_total{{event="{_escape(name)}",label="{_escape(label)}"}} {count}')
+    return "\n".join(lines) + "\n"
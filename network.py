@@ -0,0 +1,215 @@
+import threading
+import time
+import logging
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Requests per second and burst size allowed for each host.
+# Hosts are matched on their registered domain, so "www.google.com" and
+# "news.google.com" share the "google.com" budget.
+DEFAULT_HOST_RATES = {
+    "google.com": {"rate": 0.5, "burst": 2},
+    "economictimes.indiatimes.com": {"rate": 2.0, "burst": 4},
+    "business-standard.com": {"rate": 2.0, "burst": 4},
+    "default": {"rate": 4.0, "burst": 8},
+}
+
+# Browser-like headers sent with every request
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Connection pool settings
+POOL_CONNECTIONS = 16  # Number of hosts to keep pools for
+POOL_MAXSIZE = 16  # Keep-alive connections kept per host
+
+# Retry settings for transient failures
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5  # Sleeps 0.5s, 1s, 2s between attempts
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+def get_host(url):
+    """Return the lowercase host name of a URL without a leading 'www.'"""
+    host = (urlsplit(url).hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: holds up to `burst` tokens and refills
+    at `rate` tokens per second.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take one token and return how many seconds the caller must wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+class HostRateLimiter:
+    """
+    Politeness scheduler with one token bucket per host. A request only
+    waits when its own host has used up its budget.
+    """
+
+    def __init__(self, host_rates=None):
+        self.host_rates = dict(DEFAULT_HOST_RATES)
+        if host_rates:
+            self.host_rates.update(host_rates)
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def get_limits(self, host):
+        """Find the rate settings for a host, falling back to its parent domains and the default"""
+        parts = host.split(".")
+        for i in range(len(parts) - 1):
+            domain = ".".join(parts[i:])
+            if domain in self.host_rates:
+                return domain, self.host_rates[domain]
+        return "default:" + host, self.host_rates["default"]
+
+    def get_bucket(self, url):
+        """Return the token bucket that governs a URL"""
+        key, limits = self.get_limits(get_host(url))
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(limits["rate"], limits["burst"])
+                self.buckets[key] = bucket
+            return bucket
+
+    def set_rate(self, domain, rate, burst):
+        """Change the rate and burst allowed for a domain"""
+        with self.lock:
+            self.host_rates[domain] = {"rate": rate, "burst": burst}
+            self.buckets.pop(domain, None)
+
+    def acquire(self, url):
+        """Block until a request to this URL's host is allowed"""
+        delay = self.get_bucket(url).reserve()
+        if delay > 0:
+            logger.debug(f"Rate limiting {get_host(url)}: waiting {delay:.2f}s")
+            time.sleep(delay)
+        return delay
+
+# Shared scheduler used by every network call in the application
+rate_limiter = HostRateLimiter()
+
+def supports_brotli():
+    """Check whether a brotli decoder is installed so 'br' responses can be decoded"""
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            continue
+    return False
+
+def create_session():
+    """Create a requests session with keep-alive pools, compression and retry/backoff"""
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry
+    )
+    
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    session.headers['Accept-Encoding'] = "gzip, deflate, br" if supports_brotli() else "gzip, deflate"
+    return session
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Return the shared session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+def http_get(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    GET a URL through the shared session, after waiting for the host's
+    rate limit. Transient 429/5xx responses are retried with backoff.
+    """
+    rate_limiter.acquire(url)
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+def fetch_html(url, cache=None, stage='article_fetch'):
+    """
+    Return the text of a page. With an HttpCache, fresh entries are served
+    from disk and stale ones are revalidated with If-None-Match /
+    If-Modified-Since, so unchanged pages only cost a 304 response.
+    Downloaded bytes and HTTP errors are recorded under `stage`.
+    """
+    entry = cache.get(url) if cache else None
+    if entry and cache.is_fresh(entry):
+        metrics.record_cache('http', True)
+        return entry['body'].decode(entry['encoding'] or 'utf-8', errors='replace')
+    
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    
+    response = http_get(url, headers=headers)
+    metrics.add_bytes(stage, len(response.content))
+    if response.status_code >= 400:
+        metrics.record_failure(stage, f"HTTP {response.status_code}")
+    if response.status_code == 304 and entry:
+        metrics.record_cache('http', True)
+        cache.touch(url, entry)
+        return entry['body'].decode(entry['encoding'] or 'utf-8', errors='replace')
+    
+    if cache:
+        metrics.record_cache('http', False)
+    if cache and response.status_code == 200:
+        cache.put(
+            url,
+            response.content,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            encoding=response.encoding or response.apparent_encoding
+        )
+    return response.text
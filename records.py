@@ -0,0 +1,231 @@
+"""
+Compact article representations.
+
+Article is a slotted record with the fields of an article dict; it takes
+a fraction of the memory of the dict and its nested sentiment dict.
+ArticleBatch stores many articles column by column: sentiment scores and
+label codes in numpy arrays, topics and sources as ids into interned
+vocabularies, so aggregations over a batch (sentiment counts, topic and
+source frequencies) are array operations instead of per-article dict
+lookups.
+
+Both convert to and from the article dicts used by app.py and the JSON
+cache:
+
+    batch = ArticleBatch.from_articles(articles)
+    batch.sentiment_counts()      # {'Positive': 6, 'Neutral': 3, 'Negative': 1}
+    batch.to_dicts() == articles  # True
+"""
+import sys
+from collections import Counter
+from functools import cached_property
+import numpy as np
+
+# Sentiment labels; ArticleBatch stores the index of the label
+SENTIMENT_LABELS = ("Positive", "Neutral", "Negative")
+_LABEL_CODES = {label: code for code, label in enumerate(SENTIMENT_LABELS)}
+
+# Seed of the per-topic hashes behind ArticleBatch.signature_ids
+TOPIC_HASH_SEED = 20240101
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Article:
+    """
+    One analyzed article. sentiment_label is one of SENTIMENT_LABELS,
+    sentiment_score the polarity in [-1, 1] and topics a tuple of strings.
+    Keys of the article dict that are not fields (e.g. 'audio_file' in
+    saved results) are dropped.
+    """
+    __slots__ = (
+        'title', 'summary', 'content', 'url', 'date', 'source', 'sentiment_label',
+        'sentiment_score', 'topics', 'reading_time', 'audio_summary'
+    )
+
+    def __init__(self, title, summary, content, url, date, source, sentiment_label, sentiment_score,
+                 topics=(), reading_time=None, audio_summary=None):
+        self.title = title
+        self.summary = summary
+        self.content = content
+        self.url = url
+        self.date = _intern(date)
+        self.source = _intern(source)
+        self.sentiment_label = SENTIMENT_LABELS[_LABEL_CODES[sentiment_label]]
+        self.sentiment_score = float(sentiment_score)
+        self.topics = tuple(_intern(topic) for topic in topics)
+        self.reading_time = _intern(reading_time)
+        self.audio_summary = audio_summary
+
+    @classmethod
+    def from_dict(cls, data):
+        """Only the fields generate_comparative_analysis aggregates (source, sentiment, topics) are required"""
+        return cls(
+            data.get('title'), data.get('summary'), data.get('content'), data.get('url'), data.get('date'),
+            data['source'], data['sentiment']['label'], data['sentiment']['score'], data['topics'],
+            data.get('reading_time'), data.get('audio_summary')
+        )
+
+    def to_dict(self):
+        return {
+            'title': self.title,
+            'summary': self.summary,
+            'content': self.content,
+            'url': self.url,
+            'date': self.date,
+            'source': self.source,
+            'sentiment': {'label': self.sentiment_label, 'score': self.sentiment_score},
+            'topics': list(self.topics),
+            'reading_time': self.reading_time,
+            'audio_summary': self.audio_summary
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Article):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        return f"Article({self.title!r}, {self.sentiment_label}, {self.url!r})"
+
+def _as_record(article):
+    return article if isinstance(article, Article) else Article.from_dict(article)
+
+class ArticleBatch:
+    """
+    Column store for a list of articles.
+
+    - label_codes (int8) and scores (float64): sentiment per article
+    - topic_ids (int32): the topics of every article, concatenated;
+      article i has topic_ids[topic_offsets[i]:topic_offsets[i+1]]
+    - topic_names: topic strings, in order of first appearance
+    - source_ids (int32) into source_names, in order of first appearance
+    - titles, summaries, contents, urls, dates, reading_times, audio: lists
+    """
+
+    def __init__(self, articles=()):
+        records = [_as_record(article) for article in articles]
+        self.titles = [record.title for record in records]
+        self.summaries = [record.summary for record in records]
+        self.contents = [record.content for record in records]
+        self.urls = [record.url for record in records]
+        self.dates = [record.date for record in records]
+        self.reading_times = [record.reading_time for record in records]
+        self.audio = [record.audio_summary for record in records]
+
+        self.label_codes = np.fromiter((_LABEL_CODES[record.sentiment_label] for record in records), dtype=np.int8, count=len(records))
+        self.scores = np.fromiter((record.sentiment_score for record in records), dtype=np.float64, count=len(records))
+
+        source_index = {}
+        self.source_ids = np.fromiter(
+            (source_index.setdefault(record.source, len(source_index)) for record in records),
+            dtype=np.int32, count=len(records)
+        )
+        self.source_names = list(source_index)
+
+        topic_index = {}
+        self.topic_ids = np.fromiter(
+            (topic_index.setdefault(topic, len(topic_index)) for record in records for topic in record.topics),
+            dtype=np.int32
+        )
+        self.topic_names = list(topic_index)
+        self.topic_offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter((len(record.topics) for record in records), dtype=np.int64, count=len(records)),
+            out=self.topic_offsets[1:]
+        )
+
+    @classmethod
+    def from_articles(cls, articles):
+        """Build a batch from article dicts or Article records"""
+        return cls(articles)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, i):
+        return Article(
+            self.titles[i], self.summaries[i], self.contents[i], self.urls[i], self.dates[i],
+            self.source_names[self.source_ids[i]], SENTIMENT_LABELS[self.label_codes[i]],
+            self.scores[i], self.topics(i), self.reading_times[i], self.audio[i]
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_records(self):
+        return list(self)
+
+    def to_dicts(self):
+        """The articles as dicts, in the schema used by app.py and the JSON cache"""
+        return [record.to_dict() for record in self]
+
+    def topics(self, i):
+        """Topic strings of article i"""
+        return [self.topic_names[topic_id] for topic_id in self.topic_ids[self.topic_offsets[i]:self.topic_offsets[i + 1]]]
+
+    def labels(self):
+        return [SENTIMENT_LABELS[code] for code in self.label_codes]
+
+    def sentiment_counts(self):
+        """{label: number of articles} for every label, in SENTIMENT_LABELS order"""
+        counts = np.bincount(self.label_codes, minlength=len(SENTIMENT_LABELS))
+        return {label: int(count) for label, count in zip(SENTIMENT_LABELS, counts)}
+
+    def average_score(self):
+        """Mean score, summed left to right over Python floats like sum(scores) / len(scores)"""
+        return sum(self.scores.tolist()) / len(self) if len(self) else 0
+
+    def topic_counts(self):
+        """Number of mentions of each topic id"""
+        return np.bincount(self.topic_ids, minlength=len(self.topic_names))
+
+    def topic_article_index(self):
+        """Index of the article each entry of topic_ids belongs to"""
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.topic_offsets))
+
+    @cached_property
+    def _article_topic_pairs(self):
+        """(article index, topic id) of every distinct topic of every article"""
+        num_topics = max(len(self.topic_names), 1)
+        keys = np.sort(self.topic_article_index() * num_topics + self.topic_ids)
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+        return keys // num_topics, keys % num_topics
+
+    def topic_article_counts(self):
+        """Number of articles mentioning each topic id (repeats within an article count once)"""
+        _, topic_ids = self._article_topic_pairs
+        return np.bincount(topic_ids, minlength=len(self.topic_names))
+
+    def signature_ids(self):
+        """
+        Per-article ids such that two articles have the same id exactly when
+        they have the same sentiment label and the same set of topics. Topic
+        sets are compared through a 128-bit sum of random per-topic hashes.
+        """
+        articles, topic_ids = self._article_topic_pairs
+        hashes = np.random.default_rng(TOPIC_HASH_SEED).integers(
+            0, np.iinfo(np.uint64).max, size=(len(self.topic_names), 2), dtype=np.uint64, endpoint=True
+        )
+        rows = np.zeros((len(self), 3), dtype=np.uint64)
+        rows[:, 0] = self.label_codes
+        np.add.at(rows[:, 1:], articles, hashes[topic_ids])  # Wraps around, so order does not matter
+
+        # Number the distinct rows
+        order = np.lexsort(rows.T)
+        ordered = rows[order]
+        ids = np.empty(len(self), dtype=np.int64)
+        ids[order] = np.concatenate(([0], np.cumsum(np.any(ordered[1:] != ordered[:-1], axis=1))))[:len(self)]
+        return ids
+
+    def most_common_topics(self, n=None):
+        """[(topic, mentions)] like Counter.most_common: ties keep first-appearance order"""
+        counts = self.topic_counts()
+        order = np.argsort(-counts, kind='stable')[:n]
+        return [(self.topic_names[topic_id], int(counts[topic_id])) for topic_id in order]
+
+    def source_counts(self):
+        """Counter of articles per source, in order of first appearance"""
+        counts = np.bincount(self.source_ids, minlength=len(self.source_names))
+        return Counter({name: int(count) for name, count in zip(self.source_names, counts)})
@@ -0,0 +1,353 @@
+"""
+Incremental "what's new since last run" refresh for a company.
+
+A per-company store (cache/seen/<company key>.json) remembers every article
+URL seen in the search results, when it was first seen and its analyzed
+article. A refresh only downloads the search result pages, analyzes the
+URLs that are not in the store yet and merges them with the stored
+articles first seen inside the time window. The comparative analysis is
+updated from per-company tallies (ComparativeTally) with only the
+articles that entered or left the window.
+"""
+import os
+import copy
+import time
+import heapq
+import itertools
+import hashlib
+import logging
+import threading
+from collections import Counter, defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from api import (
+    DEFAULT_FETCH_WORKERS, get_news_sources, get_article_links, iter_in_order, download_article,
+    parse_article_html, analyze_article, generate_comparative_analysis, iter_coverage_differences,
+    final_sentiment_analysis, truncate_text, MAX_COVERAGE_DIFFERENCES
+)
+from dedup import DuplicateIndex, unique_urls
+from records import SENTIMENT_LABELS
+from http_cache import normalize_url
+from store import record_articles
+from utils import save_to_json, load_from_json, PIPELINE_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Articles first seen longer ago than this drop out of refresh results
+REFRESH_WINDOW_HOURS = 48
+
+# How long a URL is remembered, so articles that left the window are not
+# analyzed again while they are still listed in the search results
+SEEN_RETENTION_HOURS = 7 * 24
+
+SEEN_DIR = os.path.join('cache', 'seen')
+
+_store_locks = defaultdict(threading.Lock)
+
+# Companies whose comparative tallies are kept
+MAX_COMPARATIVE_TALLIES = 128
+
+# ComparativeTally per company key, least recently used first
+_comparative_tallies = OrderedDict()
+_comparative_lock = threading.Lock()
+
+def company_key(company_name):
+    """File name stem of a company's store: a hash of the lowercased name"""
+    return hashlib.sha256(company_name.strip().lower().encode('utf-8')).hexdigest()[:32]
+
+def store_path(company_name, store_dir=SEEN_DIR):
+    return os.path.join(store_dir, f"{company_key(company_name)}.json")
+
+def load_seen(company_name, store_dir=SEEN_DIR):
+    """
+    Load a company's store: {normalized url: {'url', 'seen_at', 'listed_at',
+    'article', 'signature'}}. 'article' is None for URLs that were skipped (unparseable
+    pages and duplicates of other articles); 'signature' is the minhash of
+    the full article content, used to spot later copies of it.
+    """
+    data = load_from_json(store_path(company_name, store_dir))
+    if not data or data.get('version') != PIPELINE_VERSION:
+        return {}
+    return data.get('urls', {})
+
+def save_seen(company_name, seen, store_dir=SEEN_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    data = {
+        'company': company_name,
+        'version': PIPELINE_VERSION,
+        'updated_at': time.time(),
+        'urls': seen
+    }
+    return save_to_json(data, store_path(company_name, store_dir))
+
+def _analyze_new(url, company_name, duplicates, position):
+    """Analyze one new URL; returns (url, article or None, done)"""
+    try:
+        try:
+            html = download_article(url)
+        except Exception as e:
+            # Not recorded, so the URL is tried again on the next refresh
+            logger.error(f"Error downloading {url}: {e}")
+            return url, None, False
+        try:
+            parsed = parse_article_html(html, url, company_name)
+            if not parsed or not duplicates.check(url, parsed['content'], position):
+                return url, None, True
+            article = analyze_article(parsed, company_name)
+            return url, article, True
+        except Exception as e:
+            logger.error(f"Error extracting data from {url}: {e}")
+            return url, None, True
+    finally:
+        duplicates.release(position)
+
+def refresh_news(company_name, window_hours=REFRESH_WINDOW_HOURS, max_articles=None,
+                 max_workers=DEFAULT_FETCH_WORKERS, store_dir=SEEN_DIR, now=None):
+    """
+    Refresh a company's articles, analyzing only URLs not seen before.
+
+    Returns a dict with 'articles' (every stored article first seen within
+    window_hours, newest first, at most max_articles), 'new_articles' (the
+    ones added by this refresh) and their 'comparative_analysis'.
+    """
+    now = time.time() if now is None else now
+    with _store_locks[store_path(company_name, store_dir)]:
+        seen = load_seen(company_name, store_dir)
+
+        # Only the search result pages are downloaded for known articles
+        sources = get_news_sources(company_name)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources)))) as executor:
+            source_links = list(executor.map(get_article_links, sources))
+        new_urls = []
+        for url in unique_urls(url for links in source_links for url in links):
+            entry = seen.get(normalize_url(url))
+            if entry:
+                entry['listed_at'] = now
+            else:
+                new_urls.append(url)
+
+        # Syndicated copies of articles we already have are skipped as well
+        window_start = now - window_hours * 3600
+        duplicates = DuplicateIndex()
+        for entry in seen.values():
+            if entry['article'] and entry['seen_at'] >= window_start and entry.get('signature'):
+                duplicates.check_signature(entry['url'], np.array(entry['signature'], dtype=np.uint64))
+
+        new_articles = []
+        for url, article, done in iter_in_order(
+            lambda item: _analyze_new(item[1], company_name, duplicates, item[0]),
+            enumerate(new_urls),
+            len(new_urls),
+            max_workers
+        ):
+            if not done:
+                continue
+            key = normalize_url(url)
+            signature = duplicates.signatures.get(key) if article else None
+            if article:
+                article = {field: value for field, value in article.items() if field != 'audio_summary'}
+                new_articles.append(article)
+            seen[key] = {
+                'url': url,
+                'seen_at': now,
+                'listed_at': now,
+                'article': article,
+                'signature': signature.tolist() if signature is not None else None
+            }
+
+        # Forget URLs that have not been listed for a long time
+        forget_before = now - max(window_hours, SEEN_RETENTION_HOURS) * 3600
+        seen = {key: entry for key, entry in seen.items() if entry['listed_at'] >= forget_before}
+        save_seen(company_name, seen, store_dir)
+        record_articles(company_name, new_articles)
+
+    # Newest first; entries from the same refresh keep their search result order
+    retained = [entry for entry in seen.values() if entry['article'] and entry['seen_at'] >= window_start]
+    retained.sort(key=lambda entry: -entry['seen_at'])
+    articles = [entry['article'] for entry in retained[:max_articles]]
+
+    return {
+        'articles': articles,
+        'new_articles': new_articles,
+        'comparative_analysis': update_comparative_analysis(company_name, articles)
+    }
+
+class ComparativeTally:
+    """
+    Running tallies behind the comparative analysis of one company's
+    articles, keyed by URL: sentiment label counts, topic mention counts,
+    the URLs mentioning each topic and source counts. update() subtracts
+    the articles that left the list or whose analysis changed and adds the
+    new ones, so a refresh that adds a few articles does not recount the
+    others. Ties are broken explicitly by the current article order, as
+    generate_comparative_analysis does: topics with the same count by
+    first mention, sources by first article, articles by position.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.label_counts = Counter()
+        self.topic_counts = Counter()
+        self.topic_urls = defaultdict(set)
+        self.source_counts = Counter()
+        self.urls = None
+        self.result = None
+        self.lock = threading.Lock()
+
+    def _add(self, url, fields):
+        self.fields[url] = fields
+        _, source, label, _, topics = fields
+        self.label_counts[label] += 1
+        self.source_counts[source] += 1
+        self.topic_counts.update(topics)
+        for topic in set(topics):
+            self.topic_urls[topic].add(url)
+
+    def _remove(self, url):
+        _, source, label, _, topics = self.fields.pop(url)
+        self.label_counts[label] -= 1
+        self.source_counts[source] -= 1
+        if not self.source_counts[source]:
+            del self.source_counts[source]
+        for topic in topics:
+            self.topic_counts[topic] -= 1
+            if not self.topic_counts[topic]:
+                del self.topic_counts[topic]
+        for topic in set(topics):
+            self.topic_urls[topic].discard(url)
+            if not self.topic_urls[topic]:
+                del self.topic_urls[topic]
+
+    def update(self, articles):
+        """Comparative analysis of articles (dicts with unique URLs), updating the tallies first"""
+        current = {article['url']: _comparative_fields(article) for article in articles}
+        urls = list(current)
+        changed = False
+        for url in [url for url, fields in self.fields.items() if current.get(url) != fields]:
+            self._remove(url)
+            changed = True
+        for url, fields in current.items():
+            if url not in self.fields:
+                self._add(url, fields)
+                changed = True
+        if changed or urls != self.urls:
+            self.urls = urls
+            self.result = self._analysis([self.fields[url] for url in urls])
+        return self.result
+
+    def _most_common_topics(self, rows, n=10):
+        """[(topic, mentions)] of the n most mentioned topics; ties in order of first mention"""
+        counts = self.topic_counts
+        threshold = heapq.nlargest(n, counts.values())[-1] if len(counts) > n else 0
+        candidates = {topic for topic, count in counts.items() if count >= threshold}
+        first_mention = {}
+        for row in rows:
+            for topic in row[4]:
+                if topic in candidates and topic not in first_mention:
+                    first_mention[topic] = len(first_mention)
+            if len(first_mention) == len(candidates):
+                break
+        ranked = sorted(candidates, key=lambda topic: (-counts[topic], first_mention[topic]))[:n]
+        return [(topic, counts[topic]) for topic in ranked]
+
+    def _sources(self, rows):
+        """Counter of articles per source, in order of first article"""
+        sources = Counter()
+        for row in rows:
+            if row[1] not in sources:
+                sources[row[1]] = self.source_counts[row[1]]
+                if len(sources) == len(self.source_counts):
+                    break
+        return sources
+
+    def _analysis(self, rows):
+        num_articles = len(rows)
+        average_sentiment_score = sum(row[3] for row in rows) / num_articles
+        coverage_differences = list(itertools.islice(
+            iter_coverage_differences(_TallyRows(rows)),
+            MAX_COVERAGE_DIFFERENCES
+        ))
+
+        # Every common topic is a topic of the first article
+        common_topics_set = {topic for topic in rows[0][4] if len(self.topic_urls[topic]) == num_articles}
+        topic_overlap = {
+            "Common Topics": list(common_topics_set),
+            "Unique Topics": {}
+        }
+
+        # Topics mentioned by a single article, grouped by article in article order
+        positions = {url: i for i, url in enumerate(self.urls)}
+        unique_topics = {topic for topic, urls in self.topic_urls.items() if len(urls) == 1}
+        unique_topics_by_article = []
+        for i in sorted({positions[next(iter(self.topic_urls[topic]))] for topic in unique_topics}):
+            unique = [topic for topic in rows[i][4] if topic in unique_topics]
+            unique_topics_by_article.append({
+                "Article": i+1,
+                "Title": truncate_text(rows[i][0], 40),
+                "Unique Topics": unique
+            })
+            # A single article's topics are all common topics
+            if num_articles > 1:
+                topic_overlap["Unique Topics"][f"Article {i+1}"] = unique
+
+        return {
+            'sentiment_counts': {label: self.label_counts[label] for label in SENTIMENT_LABELS},
+            'average_sentiment_score': average_sentiment_score,
+            'common_topics': self._most_common_topics(rows),
+            'coverage_differences': coverage_differences,
+            'topic_overlap': topic_overlap,
+            'unique_topics_by_article': unique_topics_by_article,
+            'sources': self._sources(rows),
+            'total_articles': num_articles,
+            'final_sentiment_analysis': final_sentiment_analysis(average_sentiment_score, rows[0][4][0])
+        }
+
+class _TallyRows:
+    """Article rows of a tally, with the columns iter_coverage_differences reads from an ArticleBatch"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.titles = [row[0] for row in rows]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def labels(self):
+        return [row[2] for row in self.rows]
+
+    def topics(self, i):
+        return list(self.rows[i][4])
+
+    def signature_ids(self):
+        """Ids equal exactly when the sentiment label and the set of topics are"""
+        ids = {}
+        return np.array([ids.setdefault((row[2], frozenset(row[4])), len(ids)) for row in self.rows], dtype=np.int64)
+
+def _comparative_fields(article):
+    """(title, source, label, score, topics) of an article, the fields the comparative analysis reads"""
+    sentiment = article['sentiment']
+    return (article['title'], article['source'], sentiment['label'], float(sentiment['score']), tuple(article['topics']))
+
+def update_comparative_analysis(company_name, articles):
+    """
+    Comparative analysis of a company's articles, updated from the
+    company's ComparativeTally of the previous call. Tallies of at most
+    MAX_COMPARATIVE_TALLIES companies are kept. Articles with repeated
+    URLs are analyzed from scratch.
+    """
+    if not articles:
+        return None
+    if len({article['url'] for article in articles}) != len(articles):
+        return generate_comparative_analysis(articles)
+    key = company_key(company_name)
+    with _comparative_lock:
+        tally = _comparative_tallies.get(key)
+        if tally is None:
+            tally = _comparative_tallies[key] = ComparativeTally()
+        _comparative_tallies.move_to_end(key)
+        while len(_comparative_tallies) > MAX_COMPARATIVE_TALLIES:
+            _comparative_tallies.popitem(last=False)
+    with tally.lock:
+        # A copy, so callers cannot change the tally's last result
+        return copy.deepcopy(tally.update(articles))
@@ -0,0 +1,110 @@
+"""
+Precompiled text resources shared by the analysis functions: the English
+stopword set and the rule-based Hindi translation tables and regexes.
+"""
+import re
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# NLTK data used by the analysis, as (resource path, package name)
+NLTK_RESOURCES = [
+    ('tokenizers/punkt', 'punkt'),
+    ('tokenizers/punkt_tab', 'punkt_tab'),
+    ('corpora/stopwords', 'stopwords')
+]
+
+# Dictionary mapping for simple translations
+HINDI_TRANSLATIONS = {
+    "positive": "सकारात्मक",
+    "negative": "नकारात्मक",
+    "neutral": "तटस्थ",
+    "articles": "लेख",
+    "summary": "सारांश",
+    "analysis": "विश्लेषण",
+    "news": "समाचार",
+    "sentiment": "भावना",
+    "topics": "विषय",
+    "overall": "समग्र",
+    "company": "कंपनी",
+    "based on": "के आधार पर",
+    "main": "मुख्य",
+    "discussed": "चर्चा की गई",
+    "coverage": "कवरेज",
+    "highlights": "हाइलाइट्स",
+    "concerns about": "के बारे में चिंताएँ",
+    "includes": "शामिल है",
+    "predominantly": "मुख्य रूप से",
+    "mostly": "ज्यादातर",
+    "with": "के साथ",
+    "score": "स्कोर",
+    "and": "और",
+    "are": "हैं",
+    "is": "है",
+    "the": "",
+    "a": "एक",
+    "about": "के बारे में"
+}
+
+# Company names kept in their canonical spelling
+COMMON_COMPANIES = ["Tesla", "Apple", "Google", "Microsoft", "Amazon", "Samsung", "Tata", "Reliance", "Infosys", "TCS"]
+
+def _alternation(words):
+    # Longest first, so "concerns about" wins over "about"
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+# One pass over the text for all dictionary words
+TRANSLATION_RE = re.compile(r'\b(?:' + _alternation(HINDI_TRANSLATIONS) + r')\b', re.IGNORECASE)
+
+# One pass over the text for all company names
+COMPANY_RE = re.compile(_alternation(COMMON_COMPANIES), re.IGNORECASE)
+COMPANY_SPELLINGS = {company.lower(): company for company in COMMON_COMPANIES}
+
+def translate_word(match):
+    """re.sub replacer for TRANSLATION_RE"""
+    return HINDI_TRANSLATIONS[match.group(0).lower()]
+
+def canonical_company(match):
+    """re.sub replacer for COMPANY_RE"""
+    return COMPANY_SPELLINGS[match.group(0).lower()]
+
+_stop_words = None
+_stop_words_lock = threading.Lock()
+
+def get_stop_words():
+    """English stopwords as a frozenset, read from the NLTK corpus only once"""
+    global _stop_words
+    if _stop_words is None:
+        with _stop_words_lock:
+            if _stop_words is None:
+                from nltk.corpus import stopwords
+                _stop_words = frozenset(stopwords.words('english'))
+    return _stop_words
+
+def warm_resources(download=False):
+    """
+    Load the NLTK tokenizer and stopwords and the sentiment lexicon now
+    instead of on first use. Nothing is downloaded unless download=True.
+    Returns the names of NLTK packages that are missing.
+    """
+    import nltk
+    missing = []
+    for path, package in NLTK_RESOURCES:
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            if not (download and nltk.download(package, quiet=True)):
+                missing.append(package)
+    if missing:
+        logger.error(f"Missing NLTK data {missing}, install it with: python -m nltk.downloader {' '.join(missing)}")
+
+    import batch_sentiment
+    from document import Document
+    batch_sentiment.get_lexicon()
+    try:
+        get_stop_words()
+        Document("Warm up. Resources.").sentences
+    except LookupError as e:
+        logger.error(f"Error loading NLTK data: {e}")
+    return missing
@@ -0,0 +1,372 @@
+"""
+SQLite store of analyzed articles (cache/news.db).
+
+Tables:
+- articles: one row per normalized URL, with the content hash, source,
+  raw and normalized publication date, title and content
+- analysis: summary, sentiment and topics of an article for a company
+- company_articles: which articles were found for which company, and when
+
+Company names are compared case-insensitively. Articles are written in
+batches, one transaction per call, and queries only read the matching
+rows through the indexes on company, date and sentiment:
+
+    store = get_store()
+    store.save_articles('Tesla', articles)
+    store.query_articles('Tesla', sentiment='Negative', days=7)
+
+Results already cached as JSON files can be loaded with
+`python store.py import`.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import argparse
+import itertools
+import threading
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+
+from http_cache import normalize_url
+from records import SENTIMENT_LABELS
+from utils import format_date, load_from_json, MOCK_ARTICLE_URL_PREFIX, PIPELINE_VERSION
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join('cache', 'news.db')
+
+# Cached article lists written per transaction by import_json_cache
+IMPORT_BATCH_SIZE = 500
+
+# Articles looked up per query when resolving URLs to ids
+ID_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    original_url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    source TEXT,
+    date TEXT,
+    published TEXT NOT NULL,
+    title TEXT,
+    content TEXT,
+    first_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analysis (
+    article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    company TEXT NOT NULL COLLATE NOCASE,
+    version INTEGER NOT NULL,
+    summary TEXT,
+    sentiment TEXT NOT NULL,
+    score REAL NOT NULL,
+    topics TEXT NOT NULL,
+    reading_time TEXT,
+    analyzed_at REAL NOT NULL,
+    PRIMARY KEY (article_id, company)
+);
+CREATE TABLE IF NOT EXISTS company_articles (
+    company TEXT NOT NULL COLLATE NOCASE,
+    article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (company, article_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published);
+CREATE INDEX IF NOT EXISTS idx_articles_content_hash ON articles(content_hash);
+CREATE INDEX IF NOT EXISTS idx_analysis_company_sentiment ON analysis(company, sentiment);
+CREATE INDEX IF NOT EXISTS idx_analysis_sentiment ON analysis(sentiment);
+CREATE INDEX IF NOT EXISTS idx_company_articles_seen ON company_articles(company, seen_at);
+"""
+
+def content_hash(content):
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+def published_day(date_str, seen_at):
+    """YYYY-MM-DD of an article's date, or of the time it was seen when the date is not parseable"""
+    day = format_date(date_str) if date_str else None
+    try:
+        datetime.strptime(day, '%Y-%m-%d')
+        return day
+    except (TypeError, ValueError):
+        return datetime.fromtimestamp(seen_at).strftime('%Y-%m-%d')
+
+def _day(value):
+    """A date, datetime or YYYY-MM-DD string as YYYY-MM-DD"""
+    return value if isinstance(value, str) else value.strftime('%Y-%m-%d')
+
+class ArticleStore:
+    """
+    SQLite database of articles, their analyses and the companies they
+    were found for. One connection is shared by all threads; calls are
+    serialized by a lock.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.RLock()
+        # Transactions are managed explicitly by transaction()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one transaction; nested calls use savepoints"""
+        with self.lock:
+            nested = self.conn.in_transaction
+            self.conn.execute("SAVEPOINT nested" if nested else "BEGIN")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK TO nested" if nested else "ROLLBACK")
+                if nested:
+                    self.conn.execute("RELEASE nested")
+                raise
+            self.conn.execute("RELEASE nested" if nested else "COMMIT")
+
+    def _article_ids(self, conn, urls):
+        ids = {}
+        for start in range(0, len(urls), ID_BATCH_SIZE):
+            chunk = urls[start:start + ID_BATCH_SIZE]
+            rows = conn.execute(
+                f"SELECT url, id FROM articles WHERE url IN ({','.join('?' * len(chunk))})", chunk
+            )
+            ids.update((row['url'], row['id']) for row in rows)
+        return ids
+
+    def save_articles(self, company_name, articles, seen_at=None, version=PIPELINE_VERSION):
+        """
+        Insert or update analyzed articles (dicts as returned by fetch_news)
+        for a company in one transaction. Mock articles are skipped.
+        Returns the number of articles written, or 0 on error.
+        """
+        seen_at = time.time() if seen_at is None else seen_at
+        rows = {}
+        for article in articles:
+            if not article or article['url'].startswith(MOCK_ARTICLE_URL_PREFIX):
+                continue
+            rows[normalize_url(article['url'])] = article
+        if not rows:
+            return 0
+
+        try:
+            with self.transaction() as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO articles (url, original_url, content_hash, source, date, published, title, content, first_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        content_hash = excluded.content_hash, source = excluded.source, date = excluded.date,
+                        published = excluded.published, title = excluded.title, content = excluded.content,
+                        first_seen = MIN(first_seen, excluded.first_seen)
+                    """,
+                    [
+                        (url, article['url'], content_hash(article.get('content')), article.get('source'),
+                         article.get('date'), published_day(article.get('date'), seen_at), article.get('title'),
+                         article.get('content'), seen_at)
+                        for url, article in rows.items()
+                    ]
+                )
+                ids = self._article_ids(conn, list(rows))
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO analysis
+                        (article_id, company, version, summary, sentiment, score, topics, reading_time, analyzed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (ids[url], company_name, version, article.get('summary'), article['sentiment']['label'],
+                         article['sentiment']['score'], json.dumps(article.get('topics', []), ensure_ascii=False),
+                         article.get('reading_time'), seen_at)
+                        for url, article in rows.items()
+                    ]
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO company_articles (company, article_id, seen_at) VALUES (?, ?, ?)
+                    ON CONFLICT(company, article_id) DO UPDATE SET seen_at = MAX(seen_at, excluded.seen_at)
+                    """,
+                    [(company_name, ids[url], seen_at) for url in rows]
+                )
+            return len(rows)
+        except (sqlite3.Error, KeyError, TypeError) as e:
+            logger.error(f"Error saving articles for {company_name} to {self.path}: {e}")
+            return 0
+
+    def query_articles(self, company_name=None, sentiment=None, days=None, since=None, until=None, limit=None):
+        """
+        Articles in the fetch_news dict format (without audio), newest
+        first. Filters: company, sentiment label, published within the
+        last `days` days or between `since` and `until` (dates, datetimes
+        or YYYY-MM-DD strings, inclusive).
+        """
+        conditions = []
+        params = []
+        if company_name is not None:
+            conditions.append("ca.company = ?")
+            params.append(company_name)
+        if sentiment is not None:
+            conditions.append("an.sentiment = ?")
+            params.append(sentiment)
+        if days is not None:
+            since = datetime.now() - timedelta(days=days)
+        if since is not None:
+            conditions.append("a.published >= ?")
+            params.append(_day(since))
+        if until is not None:
+            conditions.append("a.published <= ?")
+            params.append(_day(until))
+        query = f"""
+            SELECT a.title, an.summary, a.content, a.original_url, a.date, a.source, an.sentiment, an.score,
+                   an.topics, an.reading_time
+            FROM company_articles ca
+            JOIN analysis an ON an.article_id = ca.article_id AND an.company = ca.company
+            JOIN articles a ON a.id = ca.article_id
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY a.published DESC, ca.seen_at DESC
+        """
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [
+            {
+                'title': row['title'],
+                'summary': row['summary'],
+                'content': row['content'],
+                'url': row['original_url'],
+                'date': row['date'],
+                'source': row['source'],
+                'sentiment': {'label': row['sentiment'], 'score': row['score']},
+                'topics': json.loads(row['topics']),
+                'reading_time': row['reading_time'],
+                'audio_summary': None
+            } for row in rows
+        ]
+
+    def sentiment_counts(self, company_name, days=None):
+        """{label: number of articles} for a company, optionally over the last `days` days"""
+        query = """
+            SELECT an.sentiment, COUNT(*) AS count
+            FROM company_articles ca
+            JOIN analysis an ON an.article_id = ca.article_id AND an.company = ca.company
+            JOIN articles a ON a.id = ca.article_id
+            WHERE ca.company = ?
+        """
+        params = [company_name]
+        if days is not None:
+            query += " AND a.published >= ?"
+            params.append(_day(datetime.now() - timedelta(days=days)))
+        query += " GROUP BY an.sentiment"
+        counts = dict.fromkeys(SENTIMENT_LABELS, 0)
+        with self.lock:
+            for row in self.conn.execute(query, params):
+                counts[row['sentiment']] = row['count']
+        return counts
+
+    def companies(self):
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT company FROM company_articles ORDER BY company")]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """Return the shared store at DEFAULT_DB_PATH, opening it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ArticleStore()
+    return _store
+
+def record_articles(company_name, articles):
+    """Save articles to the shared store; errors are logged, not raised"""
+    try:
+        return get_store().save_articles(company_name, articles)
+    except (sqlite3.Error, OSError) as e:
+        logger.error(f"Error opening article store {DEFAULT_DB_PATH}: {e}")
+        return 0
+
+def _cached_article_sets(cache_dir):
+    """Yield (company, articles, seen_at) from the company result caches and the refresh stores"""
+    for directory in (cache_dir, os.path.join(cache_dir, 'seen')):
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if not entry.name.endswith('.json') or not entry.is_file():
+                continue
+            data = load_from_json(entry.path)
+            if not isinstance(data, dict) or not data.get('company'):
+                continue
+            if 'articles' in data:
+                yield data['company'], data['articles'], data.get('created_at') or entry.stat().st_mtime
+            elif 'urls' in data:
+                for seen in data['urls'].values():
+                    if seen.get('article'):
+                        yield data['company'], [seen['article']], seen.get('seen_at')
+
+def import_json_cache(cache_dir='cache', store=None):
+    """
+    Load the articles of the cached company results (cache/*.json) and of
+    the refresh stores (cache/seen/*.json) into the store, in transactions
+    of IMPORT_BATCH_SIZE article lists. Returns the number of articles written.
+    """
+    store = store or get_store()
+    article_sets = _cached_article_sets(cache_dir)
+    imported = 0
+    while True:
+        batch = list(itertools.islice(article_sets, IMPORT_BATCH_SIZE))
+        if not batch:
+            return imported
+        with store.transaction():
+            for company_name, articles, seen_at in batch:
+                imported += store.save_articles(company_name, articles, seen_at)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Article store")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="database file")
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help="load cached JSON results into the store")
+    import_parser.add_argument('--cache-dir', default='cache')
+    query_parser = commands.add_parser('query', help="list stored articles")
+    query_parser.add_argument('company', nargs='?')
+    query_parser.add_argument('--sentiment', choices=SENTIMENT_LABELS)
+    query_parser.add_argument('--days', type=int)
+    query_parser.add_argument('--limit', type=int)
+    args = parser.parse_args(argv)
+
+    with ArticleStore(args.db) as store:
+        if args.command == 'import':
+            start = time.perf_counter()
+            count = import_json_cache(args.cache_dir, store)
+            print(f"Imported {count} articles in {time.perf_counter() - start:.1f}s")
+        else:
+            for article in store.query_articles(args.company, args.sentiment, args.days, limit=args.limit):
+                print(f"{article['date']}  {article['sentiment']['label']:8}  {article['source']}  {article['title']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
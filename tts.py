@@ -0,0 +1,225 @@
+import io
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http_cache import write_atomic
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Longest piece of text sent to the backend in one request
+MAX_CHUNK_CHARS = 200
+
+# Number of chunks synthesized at the same time
+TTS_WORKERS = 4
+
+# Sentence boundaries, including the Devanagari danda
+SENTENCE_END_RE = re.compile(r'(?<=[\.\!\?।])\s+')
+
+class GTTSBackend:
+    """Google Translate text-to-speech (needs network access)"""
+
+    def synthesize(self, text, lang, slow=False):
+        from gtts import gTTS
+        tts = gTTS(text=text, lang=lang, slow=slow)
+        audio_io = io.BytesIO()
+        tts.write_to_fp(audio_io)
+        return audio_io.getvalue()
+
+class OfflineBackend:
+    """
+    Local stand-in for the TTS service. Produces silent MPEG audio frames,
+    one per few characters, so results are deterministic, concatenate like
+    real MP3 chunks and need no network. An optional delay simulates
+    service latency.
+    """
+
+    # MPEG-1 Layer III, 128 kbit/s, 44.1 kHz frame header followed by a silent payload
+    FRAME = b'\xff\xfb\x90\x64' + b'\x00' * 413
+
+    def __init__(self, delay=0.0, chars_per_frame=10):
+        self.delay = delay
+        self.chars_per_frame = chars_per_frame
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def synthesize(self, text, lang, slow=False):
+        with self.lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self.FRAME * max(1, len(text) // self.chars_per_frame)
+
+_backend = GTTSBackend()
+
+def set_tts_backend(backend):
+    """Replace the TTS backend (any object with synthesize(text, lang, slow) -> bytes)"""
+    global _backend
+    _backend = backend
+
+def get_tts_backend():
+    """Return the active TTS backend"""
+    return _backend
+
+class TTSCache:
+    """
+    On-disk cache of synthesized audio keyed on (text hash, language, speed).
+    The least recently used files are evicted once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir=os.path.join('cache', 'tts'), max_bytes=100 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total_bytes = None  # Computed lazily on first write
+
+    def key(self, text, lang, slow):
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{text_hash}_{lang}_{'slow' if slow else 'normal'}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def get(self, text, lang, slow=False):
+        """Return cached audio bytes, or None"""
+        path = self._path(self.key(text, lang, slow))
+        try:
+            with open(path, 'rb') as f:
+                audio = f.read()
+            os.utime(path)  # Mark as recently used
+            return audio
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading TTS cache entry {path}: {e}")
+            return None
+
+    def put(self, text, lang, slow, audio):
+        """Store audio bytes for a piece of text"""
+        try:
+            with self.lock:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                if self.total_bytes is None:
+                    self.total_bytes = sum(
+                        entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.name.endswith('.mp3')
+                    )
+                path = self._path(self.key(text, lang, slow))
+                if not os.path.exists(path):
+                    write_atomic(path, audio)
+                    self.total_bytes += len(audio)
+                if self.total_bytes > self.max_bytes:
+                    self._evict()
+        except Exception as e:
+            logger.error(f"Error writing TTS cache entry: {e}")
+
+    def clear(self):
+        """Remove every cached audio file"""
+        with self.lock:
+            if os.path.isdir(self.cache_dir):
+                for entry in os.scandir(self.cache_dir):
+                    if entry.name.endswith('.mp3'):
+                        os.remove(entry.path)
+            self.total_bytes = 0
+
+    def _evict(self):
+        """Delete least recently used files until the cache is 10% under its cap"""
+        entries = sorted(
+            (entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.mp3')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries:
+            if self.total_bytes <= self.max_bytes * 0.9:
+                break
+            self.total_bytes -= entry.stat().st_size
+            os.remove(entry.path)
+
+tts_cache = TTSCache()
+
+def split_text(text, max_chars=MAX_CHUNK_CHARS):
+    """
+    Split text into chunks of at most max_chars, breaking at sentence
+    boundaries where possible and at spaces otherwise
+    """
+    chunks = []
+    current = ""
+    for sentence in SENTENCE_END_RE.split(text.strip()):
+        # Break up sentences that are too long on their own
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+    return _executor
+
+def _synthesize_chunk(chunk, lang, slow, cache):
+    audio = cache.get(chunk, lang, slow) if cache else None
+    if audio is None:
+        audio = get_tts_backend().synthesize(chunk, lang, slow)
+        if cache:
+            cache.put(chunk, lang, slow, audio)
+    return audio
+
+def stream_speech(text, lang='hi', slow=False, cache=tts_cache):
+    """
+    Yield audio for text chunk by chunk, in order, as soon as each chunk is
+    ready. Chunks are synthesized in parallel; the MP3 pieces can be played
+    or written one after another.
+    """
+    if not text or not text.strip():
+        return
+
+    audio = cache.get(text, lang, slow) if cache else None
+    if cache:
+        metrics.record_cache('tts', audio is not None)
+    if audio is not None:
+        yield audio
+        return
+
+    chunks = split_text(text)
+    futures = [_get_executor().submit(_synthesize_chunk, chunk, lang, slow, cache) for chunk in chunks]
+    pieces = []
+    try:
+        for future in futures:
+            piece = future.result()
+            pieces.append(piece)
+            yield piece
+    finally:
+        for future in futures:
+            future.cancel()
+
+    if cache and len(pieces) == len(chunks):
+        cache.put(text, lang, slow, b''.join(pieces))
+
+def synthesize_speech(text, lang='hi', slow=False, cache=tts_cache):
+    """Return the complete audio for text as MP3 bytes"""
+    with metrics.stage('tts'):
+        return b''.join(stream_speech(text, lang, slow, cache))
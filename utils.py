@@ -3,18 +3,36 @@ import re
 import logging
 from datetime import datetime
 import json
+import time
+import hashlib
+import tempfile
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+def configure_logging(log_file="app.log", level=logging.INFO):
+    """
+    Log to the console and to log_file (None for console only). Called by
+    the entry points (app.py, batch.py) rather than at import time.
+    """
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
+# Bump whenever the structure or content of analyzed articles changes,
+# so results cached by older versions are not reused
+PIPELINE_VERSION = 1
+
+# Default freshness of cached company results
+CACHE_TTL_HOURS = 6
+
+# URLs of generated placeholder articles (api.generate_mock_article)
+MOCK_ARTICLE_URL_PREFIX = "https://example.com/news/"
+
 def clean_text(text):
     """
     Clean and normalize text
@@ -60,11 +78,11 @@ def format_date(date_str):
         logger.error(f"Error formatting date {date_str}: {e}")
         return date_str
 
-def generate_cache_key(company_name):
+def generate_cache_key(company_name, num_articles=10, version=PIPELINE_VERSION):
     """
     Generate a cache key for storing fetched news data
     """
-    return f"{company_name.lower().replace(' ', '')}{datetime.now().strftime('%Y%m%d')}"
+    return f"{company_name.lower().replace(' ', '')}_{num_articles}_v{version}"
 
 def calculate_reading_time(text):
     """
@@ -97,12 +115,18 @@ def save_to_json(data, filename):
     """
     Save data to a JSON file
     """
+    tmp_path = None
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
+        # Write to a temporary file first so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filename) or '.', prefix='.tmp-', suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, filename)
         return True
     except Exception as e:
         logger.error(f"Error saving to JSON: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False
 
 def load_from_json(filename):
@@ -127,23 +151,78 @@ def create_cache_dir():
         os.makedirs(cache_dir)
     return cache_dir
 
-def get_cached_data(company_name, max_age_hours=6):
+def save_audio(audio_bytes, cache_dir):
+    """
+    Store audio bytes under <cache_dir>/audio, named by their content hash,
+    and return the file path
+    """
+    audio_dir = os.path.join(cache_dir, 'audio')
+    os.makedirs(audio_dir, exist_ok=True)
+    audio_path = os.path.join(audio_dir, f"{hashlib.sha256(audio_bytes).hexdigest()}.mp3")
+    if not os.path.exists(audio_path):
+        with open(audio_path, 'wb') as f:
+            f.write(audio_bytes)
+    return audio_path
+
+def load_audio(audio_path):
+    """
+    Read audio bytes saved with save_audio
+    """
+    try:
+        with open(audio_path, 'rb') as f:
+            return f.read()
+    except Exception as e:
+        logger.error(f"Error loading audio {audio_path}: {e}")
+        return None
+
+def save_cached_data(company_name, num_articles, articles):
+    """
+    Cache analyzed articles for a company. Audio bytes are written to
+    separate files and the JSON only keeps their paths.
+    """
+    cache_dir = create_cache_dir()
+    stored_articles = []
+    for article in articles:
+        article = dict(article)
+        audio = article.pop('audio_summary', None)
+        if audio:
+            article['audio_file'] = save_audio(audio, cache_dir)
+        stored_articles.append(article)
+
+    cache_data = {
+        'company': company_name,
+        'num_articles': num_articles,
+        'version': PIPELINE_VERSION,
+        'created_at': time.time(),
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'articles': stored_articles
+    }
+    cache_key = generate_cache_key(company_name, num_articles)
+    return save_to_json(cache_data, os.path.join(cache_dir, f"{cache_key}.json"))
+
+def get_cached_data(company_name, num_articles=10, max_age_hours=CACHE_TTL_HOURS):
     """
     Get cached data for a company if available and not too old
     """
     cache_dir = create_cache_dir()
-    cache_key = generate_cache_key(company_name)
+    cache_key = generate_cache_key(company_name, num_articles)
     cache_file = os.path.join(cache_dir, f"{cache_key}.json")
 
-    if os.path.exists(cache_file):
-        # Check file age
-        file_time = os.path.getmtime(cache_file)
-        age_hours = (datetime.now().timestamp() - file_time) / 3600
+    cache_data = load_from_json(cache_file)
+    if not cache_data or cache_data.get('version') != PIPELINE_VERSION:
+        return None
+
+    # Check data age
+    age_hours = (time.time() - cache_data.get('created_at', 0)) / 3600
+    if age_hours > max_age_hours:
+        return None
 
-        if age_hours <= max_age_hours:
-            return load_from_json(cache_file)
+    for article in cache_data.get('articles', []):
+        audio_file = article.pop('audio_file', None)
+        if audio_file:
+            article['audio_summary'] = load_audio(audio_file)
 
-    return None
+    return cache_data
 
 def predict_stock_trend(sentiment_counts, avg_sentiment_score):
     """
@@ -165,4 +244,4 @@ def predict_stock_trend(sentiment_counts, avg_sentiment_score):
     elif negative_ratio > 0.4:
         return "Slight negative market reaction possible"
     else:
-        return "Stable market performance expected"
\ No newline at end of file
+        return "Stable market performance expected"